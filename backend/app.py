@@ -1,31 +1,44 @@
 """FastAPI application for promptdesign."""
 
+import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
 
+import orjson
 from dotenv import load_dotenv
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 
 # Load environment variables from .env file
 load_dotenv()
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, Response
 from fastapi.staticfiles import StaticFiles
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from starlette.types import Scope
 
+from backend.middleware.cors import PureASGICors
 from backend.routes import analysis, prompts
+from backend.services.config import get_config
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Load the analysis config once at startup instead of on the first request."""
+    get_config()
+    yield
+
 
 app = FastAPI(
     title="PromptDesign",
     description="API for evaluating prompts and suggesting improvements",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS for local development
 app.add_middleware(
-    CORSMiddleware,
+    PureASGICors,
     allow_origins=["http://localhost:5173", "http://127.0.0.1:5173"],  # Vite default
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
 )
 
 # Include routers
@@ -33,77 +46,92 @@ app.include_router(prompts.router, prefix="/api/prompts", tags=["prompts"])
 app.include_router(analysis.router, prefix="/api/analysis", tags=["analysis"])
 
 
-@app.get("/api/health")
-async def health_check() -> dict[str, str]:
+# The health payload never changes, so it is encoded once
+_HEALTH_BODY = orjson.dumps({"status": "healthy"})
+
+
+@app.get("/api/health", response_model=dict[str, str])
+async def health_check() -> Response:
     """Health check endpoint."""
-    return {"status": "healthy"}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 
 # Static file serving for production
 FRONTEND_DIR = Path(__file__).parent.parent / "frontend"
 DIST_DIR = FRONTEND_DIR / "dist"
 
-# Check if frontend is built
+_HTML_MEDIA_TYPE = "text/html; charset=utf-8"
+
+# Fallback pages, encoded once at import rather than per request
+_NOT_BUILT_BODY = b"<h1>Frontend not built</h1><p>Run: cd frontend && npm run build</p>"
+
+_ROOT_BODY = b"""\
+<html>
+<head><title>PromptDesign</title></head>
+<body style="font-family: system-ui; max-width: 600px; margin: 50px auto; padding: 20px;">
+    <h1>PromptDesign API</h1>
+    <p>The frontend is not built yet.</p>
+    <h3>Option 1: Build the frontend</h3>
+    <pre style="background: #f5f5f5; padding: 15px; border-radius: 8px;">cd frontend
+npm install
+npm run build</pre>
+    <p>Then restart the server.</p>
+    <h3>Option 2: Development mode</h3>
+    <p>Run the frontend dev server separately:</p>
+    <pre style="background: #f5f5f5; padding: 15px; border-radius: 8px;">cd frontend && npm run dev</pre>
+    <p>Then open <a href="http://localhost:5173">http://localhost:5173</a></p>
+    <hr>
+    <p>API is available at <a href="/api/health">/api/health</a></p>
+</body>
+</html>
+"""
+
+# Built JS/CSS bundles are streamed in larger chunks than Starlette's 64 KiB default
+ASSET_CHUNK_SIZE = 256 * 1024
+
+
+class AssetFiles(StaticFiles):
+    """StaticFiles that streams files with ASSET_CHUNK_SIZE chunks."""
+
+    def file_response(self, *args, **kwargs) -> Response:
+        response = super().file_response(*args, **kwargs)
+        if isinstance(response, FileResponse):
+            response.chunk_size = ASSET_CHUNK_SIZE
+        return response
+
+
+class SPAFiles(AssetFiles):
+    """Serve the built SPA, falling back to index.html for unknown paths.
+
+    Only misses reach the Python fallback; existing files are served directly.
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        try:
+            return await super().get_response(path, scope)
+        except StarletteHTTPException as exc:
+            # Unknown API routes must stay 404 rather than return the SPA
+            if exc.status_code != 404 or path == "api" or path.startswith("api" + os.sep):
+                raise
+
+        if path == "favicon.ico":
+            try:
+                return await super().get_response("vite.svg", scope)
+            except StarletteHTTPException:
+                return Response(status_code=204)
+
+        try:
+            return await super().get_response("index.html", scope)
+        except StarletteHTTPException:
+            return Response(content=_NOT_BUILT_BODY, media_type=_HTML_MEDIA_TYPE, status_code=200)
+
+
+# Check if frontend is built. Mounted last so the API routes above match first.
 if DIST_DIR.exists():
-    # Serve static assets
-    app.mount("/assets", StaticFiles(directory=DIST_DIR / "assets"), name="assets")
-
-    @app.get("/favicon.ico")
-    async def favicon():
-        favicon_path = DIST_DIR / "favicon.ico"
-        if favicon_path.exists():
-            return FileResponse(favicon_path)
-        # Fallback to vite.svg
-        svg_path = DIST_DIR / "vite.svg"
-        if svg_path.exists():
-            return FileResponse(svg_path, media_type="image/svg+xml")
-        return HTMLResponse(status_code=204)
-
-    @app.get("/{full_path:path}")
-    async def serve_spa(request: Request, full_path: str):
-        """Serve the SPA for all non-API routes."""
-        # Don't intercept API routes
-        if full_path.startswith("api/"):
-            return HTMLResponse(status_code=404)
-
-        # Try to serve static file first
-        file_path = DIST_DIR / full_path
-        if file_path.is_file():
-            return FileResponse(file_path)
-
-        # Fallback to index.html for SPA routing
-        index_path = DIST_DIR / "index.html"
-        if index_path.exists():
-            return FileResponse(index_path)
-
-        return HTMLResponse(
-            content="<h1>Frontend not built</h1><p>Run: cd frontend && npm run build</p>",
-            status_code=200,
-        )
+    app.mount("/assets", AssetFiles(directory=DIST_DIR / "assets"), name="assets")
+    app.mount("/", SPAFiles(directory=DIST_DIR, html=True), name="spa")
 else:
     @app.get("/")
     async def root():
         """Show instructions when frontend is not built."""
-        return HTMLResponse(
-            content="""
-            <html>
-            <head><title>PromptDesign</title></head>
-            <body style="font-family: system-ui; max-width: 600px; margin: 50px auto; padding: 20px;">
-                <h1>PromptDesign API</h1>
-                <p>The frontend is not built yet.</p>
-                <h3>Option 1: Build the frontend</h3>
-                <pre style="background: #f5f5f5; padding: 15px; border-radius: 8px;">cd frontend
-npm install
-npm run build</pre>
-                <p>Then restart the server.</p>
-                <h3>Option 2: Development mode</h3>
-                <p>Run the frontend dev server separately:</p>
-                <pre style="background: #f5f5f5; padding: 15px; border-radius: 8px;">cd frontend && npm run dev</pre>
-                <p>Then open <a href="http://localhost:5173">http://localhost:5173</a></p>
-                <hr>
-                <p>API is available at <a href="/api/health">/api/health</a></p>
-            </body>
-            </html>
-            """,
-            status_code=200,
-        )
+        return Response(content=_ROOT_BODY, media_type=_HTML_MEDIA_TYPE, status_code=200)
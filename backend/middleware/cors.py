@@ -0,0 +1,93 @@
+"""Pure ASGI CORS middleware.
+
+Avoids the per-request Request/Response wrappers of Starlette's CORSMiddleware
+by working directly on the ASGI scope and emitting precomputed header tuples.
+"""
+
+from typing import Any, Awaitable, Callable
+
+Scope = dict[str, Any]
+Message = dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+# Body of the 400 reply to a preflight from an origin that is not allowed
+_DISALLOWED_ORIGIN_BODY = b"Disallowed CORS origin"
+
+_VARY_ORIGIN_HEADERS = [(b"vary", b"Origin")]
+
+
+class PureASGICors:
+    """CORS middleware allowing credentials, any method and any header.
+
+    Only origins listed in ``allow_origins`` receive CORS headers.
+    """
+
+    def __init__(self, app: ASGIApp, allow_origins: list[str]) -> None:
+        self.app = app
+        # Encode the allowed origins once so requests only do a set lookup
+        self._allow_origins = frozenset(origin.encode("latin-1") for origin in allow_origins)
+        self._simple_headers = [
+            (b"access-control-allow-credentials", b"true"),
+            (b"vary", b"Origin"),
+        ]
+        self._preflight_headers = [
+            (b"access-control-allow-methods", b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"),
+            (b"access-control-allow-credentials", b"true"),
+            (b"access-control-max-age", b"600"),
+            (b"vary", b"Origin"),
+            (b"content-length", b"0"),
+        ]
+        self._rejected_headers = [
+            *self._preflight_headers[:-1],
+            (b"content-length", str(len(_DISALLOWED_ORIGIN_BODY)).encode("latin-1")),
+            (b"content-type", b"text/plain; charset=utf-8"),
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = None
+        request_headers = None
+        for key, value in scope["headers"]:
+            if key == b"origin":
+                origin = value
+            elif key == b"access-control-request-headers":
+                request_headers = value
+
+        allowed = origin is not None and origin in self._allow_origins
+        if origin is not None and scope["method"] == "OPTIONS" and any(
+            key == b"access-control-request-method" for key, _ in scope["headers"]
+        ):
+            if allowed:
+                status = 204
+                headers = [(b"access-control-allow-origin", origin), *self._preflight_headers]
+                body = b""
+            else:
+                # Rejected like Starlette's CORSMiddleware rather than passed to the app
+                status = 400
+                headers = [*self._rejected_headers]
+                body = _DISALLOWED_ORIGIN_BODY
+            if request_headers is not None:
+                # Echo requested headers; "*" is not honoured with credentials
+                headers.append((b"access-control-allow-headers", request_headers))
+            await send({"type": "http.response.start", "status": status, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        # Responses without CORS headers still vary on Origin, so a shared
+        # cache never serves them to an allowed origin
+        if allowed:
+            cors_headers = [(b"access-control-allow-origin", origin), *self._simple_headers]
+        else:
+            cors_headers = _VARY_ORIGIN_HEADERS
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *cors_headers]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,8 +1,10 @@
 """Pydantic models for promptdesign."""
 
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional
-from pydantic import BaseModel, Field
+from typing import Annotated, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class PromptType(str, Enum):
@@ -16,6 +18,8 @@ class PromptType(str, Enum):
 class PromptMetadata(BaseModel):
     """Metadata from YAML frontmatter."""
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     name: Optional[str] = None
     description: Optional[str] = None
     license: Optional[str] = None
@@ -28,6 +32,10 @@ class PromptMetadata(BaseModel):
 class Prompt(BaseModel):
     """A parsed prompt from a markdown file."""
 
+    # Prompts are shared between the store and analysis caches, so they are
+    # immutable; use model_copy(update=...) to derive a changed prompt
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     id: str = Field(description="Unique identifier for the prompt")
     name: str = Field(description="Name of the prompt (from heading or frontmatter)")
     type: PromptType = Field(description="Type of prompt (system, user, or skill)")
@@ -37,28 +45,40 @@ class Prompt(BaseModel):
     metadata: Optional[PromptMetadata] = Field(default=None, description="YAML frontmatter metadata")
 
 
-class Issue(BaseModel):
+# Analysis results are built many times per prompt, so they are plain slotted
+# dataclasses rather than BaseModels: construction skips validation, while the
+# Annotated Field metadata still documents them in the OpenAPI schema.
+
+
+@dataclass(slots=True)
+class Issue:
     """An issue found during analysis."""
 
-    message: str = Field(description="Description of the issue")
-    line: Optional[int] = Field(default=None, description="Line number where issue occurs")
-    line_end: Optional[int] = Field(default=None, description="End line for multi-line issues")
-    snippet: Optional[str] = Field(default=None, description="Relevant text snippet")
+    message: Annotated[str, Field(description="Description of the issue")]
+    line: Annotated[Optional[int], Field(description="Line number where issue occurs")] = None
+    line_end: Annotated[Optional[int], Field(description="End line for multi-line issues")] = None
+    snippet: Annotated[Optional[str], Field(description="Relevant text snippet")] = None
 
 
-class DimensionScore(BaseModel):
+@dataclass(slots=True)
+class DimensionScore:
     """Score for a single analysis dimension."""
 
-    score: int = Field(ge=0, le=100, description="Score from 0-100")
-    issues: list[Issue] = Field(default_factory=list, description="List of issues found")
-    suggestions: list[str] = Field(default_factory=list, description="Quick-fix suggestions")
+    score: Annotated[int, Field(ge=0, le=100, description="Score from 0-100")]
+    issues: Annotated[list[Issue], Field(description="List of issues found")] = field(
+        default_factory=list
+    )
+    suggestions: Annotated[list[str], Field(description="Quick-fix suggestions")] = field(
+        default_factory=list
+    )
 
 
-class HeuristicAnalysis(BaseModel):
+@dataclass(slots=True)
+class HeuristicAnalysis:
     """Results from heuristic analysis."""
 
     prompt_id: str
-    overall_score: int = Field(ge=0, le=100)
+    overall_score: Annotated[int, Field(ge=0, le=100)]
     clarity: DimensionScore
     specificity: DimensionScore
     structure: DimensionScore
@@ -76,15 +96,16 @@ class LLMAnalysisStatus(str, Enum):
     FAILED = "failed"
 
 
-class LLMAnalysis(BaseModel):
+@dataclass(slots=True)
+class LLMAnalysis:
     """Results from LLM-powered analysis."""
 
     prompt_id: str
     status: LLMAnalysisStatus = LLMAnalysisStatus.PENDING
-    ambiguities: list[str] = Field(default_factory=list)
-    missing_context: list[str] = Field(default_factory=list)
-    injection_risks: list[str] = Field(default_factory=list)
-    best_practice_issues: list[str] = Field(default_factory=list)
+    ambiguities: list[str] = field(default_factory=list)
+    missing_context: list[str] = field(default_factory=list)
+    injection_risks: list[str] = field(default_factory=list)
+    best_practice_issues: list[str] = field(default_factory=list)
     suggested_revision: Optional[str] = None
     revision_explanation: Optional[str] = None
     error: Optional[str] = None
@@ -103,6 +124,12 @@ class AnalysisRequest(BaseModel):
     prompt_id: str
 
 
+class BatchAnalysisRequest(BaseModel):
+    """Request to analyze several prompts at once."""
+
+    prompt_ids: list[str] = Field(default_factory=list, description="IDs to analyze (empty = all)")
+
+
 class SuggestionRequest(BaseModel):
     """Request to generate improvement suggestions."""
 
@@ -4,25 +4,57 @@ import asyncio
 import uuid
 from typing import Any
 
-from fastapi import APIRouter, BackgroundTasks, HTTPException
+import orjson
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Response
 from pydantic import BaseModel
 
 from backend.models.schemas import (
     AnalysisRequest,
+    BatchAnalysisRequest,
     HeuristicAnalysis,
     LLMAnalysis,
     LLMAnalysisStatus,
     SuggestionRequest,
 )
 from backend.routes.prompts import _prompt_store
-from backend.services.heuristics import analyze_prompt
+from backend.services.bounded_dict import BoundedDict
+from backend.services.heuristics import analyze_prompt, analyze_prompts
+from backend.services.llm import analyze_with_llm
+from backend.services.llm import generate_suggestions as generate_llm_suggestions
 
 router = APIRouter()
 
-# In-memory storage for analysis results
-_heuristic_results: dict[str, HeuristicAnalysis] = {}
-_llm_results: dict[str, LLMAnalysis] = {}
-_llm_jobs: dict[str, str] = {}  # job_id -> prompt_id
+# In-memory storage for analysis results. Heuristic results keep the serialized
+# response body alongside the model so cache hits skip re-serialization.
+_heuristic_results: BoundedDict[str, tuple[HeuristicAnalysis, bytes]] = BoundedDict(
+    maxsize=10_000
+)
+_llm_results: BoundedDict[str, LLMAnalysis] = BoundedDict(maxsize=10_000)  # job_id -> result
+_prompt_latest_job: BoundedDict[str, str] = BoundedDict(maxsize=10_000)  # prompt_id -> job_id
+
+
+_IN_FLIGHT = (LLMAnalysisStatus.PENDING, LLMAnalysisStatus.RUNNING)
+
+
+def clear_analysis_results() -> None:
+    """Drop cached analysis results, e.g. when a new file replaces the prompts.
+
+    Pending and running LLM jobs are kept so their status stays pollable and
+    their background tasks can still record a result.
+    """
+    _heuristic_results.clear()
+    in_flight = {
+        job_id: result for job_id, result in _llm_results.items() if result.status in _IN_FLIGHT
+    }
+    latest = {
+        prompt_id: job_id
+        for prompt_id, job_id in _prompt_latest_job.items()
+        if job_id in in_flight
+    }
+    _llm_results.clear()
+    _llm_results.update(in_flight)
+    _prompt_latest_job.clear()
+    _prompt_latest_job.update(latest)
 
 
 class HeuristicResponse(BaseModel):
@@ -31,6 +63,12 @@ class HeuristicResponse(BaseModel):
     analysis: HeuristicAnalysis
 
 
+class HeuristicBatchResponse(BaseModel):
+    """Response containing heuristic analyses for several prompts."""
+
+    analyses: list[HeuristicAnalysis]
+
+
 class LLMJobResponse(BaseModel):
     """Response for LLM analysis job creation."""
 
@@ -55,8 +93,15 @@ class SuggestionResponse(BaseModel):
     changes: list[dict[str, Any]]
 
 
+def _cache_heuristic(prompt_id: str, analysis: HeuristicAnalysis) -> bytes:
+    """Cache a heuristic analysis and return its serialized response body."""
+    payload = orjson.dumps({"analysis": analysis})
+    _heuristic_results[prompt_id] = (analysis, payload)
+    return payload
+
+
 @router.post("/heuristics", response_model=HeuristicResponse)
-async def run_heuristic_analysis(request: AnalysisRequest) -> HeuristicResponse:
+async def run_heuristic_analysis(request: AnalysisRequest) -> Response:
     """Run heuristic analysis on a prompt."""
     prompt_id = request.prompt_id
 
@@ -64,40 +109,60 @@ async def run_heuristic_analysis(request: AnalysisRequest) -> HeuristicResponse:
         raise HTTPException(status_code=404, detail="Prompt not found")
 
     prompt = _prompt_store[prompt_id]
-    analysis = analyze_prompt(prompt)
+    # Analysis is CPU-bound, so run it off the event loop
+    analysis = await asyncio.to_thread(analyze_prompt, prompt)
 
     # Cache the result
-    _heuristic_results[prompt_id] = analysis
+    payload = _cache_heuristic(prompt_id, analysis)
+
+    return Response(content=payload, media_type="application/json")
 
-    return HeuristicResponse(analysis=analysis)
+
+@router.post("/heuristics/batch", response_model=HeuristicBatchResponse)
+async def run_heuristic_batch(request: BatchAnalysisRequest) -> Response:
+    """Run heuristic analysis on several prompts in one pass."""
+    prompt_ids = request.prompt_ids or list(_prompt_store.keys())
+
+    missing = [pid for pid in prompt_ids if pid not in _prompt_store]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Prompts not found: {', '.join(missing)}")
+
+    prompts = [_prompt_store[pid] for pid in prompt_ids]
+    analyses = await asyncio.to_thread(analyze_prompts, prompts)
+    for prompt_id, analysis in zip(prompt_ids, analyses):
+        _cache_heuristic(prompt_id, analysis)
+
+    payload = orjson.dumps({"analyses": analyses})
+    return Response(content=payload, media_type="application/json")
 
 
 @router.get("/heuristics/{prompt_id}", response_model=HeuristicResponse)
-async def get_heuristic_analysis(prompt_id: str) -> HeuristicResponse:
+async def get_heuristic_analysis(prompt_id: str) -> Response:
     """Get cached heuristic analysis for a prompt."""
-    if prompt_id not in _heuristic_results:
-        # Run analysis if not cached
-        if prompt_id not in _prompt_store:
-            raise HTTPException(status_code=404, detail="Prompt not found")
-        prompt = _prompt_store[prompt_id]
-        analysis = analyze_prompt(prompt)
-        _heuristic_results[prompt_id] = analysis
+    cached = _heuristic_results.get(prompt_id)
+    if cached is not None:
+        return Response(content=cached[1], media_type="application/json")
+
+    # Run analysis if not cached
+    if prompt_id not in _prompt_store:
+        raise HTTPException(status_code=404, detail="Prompt not found")
+    prompt = _prompt_store[prompt_id]
+    analysis = await asyncio.to_thread(analyze_prompt, prompt)
+    payload = _cache_heuristic(prompt_id, analysis)
 
-    return HeuristicResponse(analysis=_heuristic_results[prompt_id])
+    return Response(content=payload, media_type="application/json")
 
 
 async def _run_llm_analysis(job_id: str, prompt_id: str) -> None:
     """Background task to run LLM analysis."""
-    from backend.services.llm import analyze_with_llm
-
     try:
         # Update status to running
-        if prompt_id in _llm_results:
-            _llm_results[prompt_id].status = LLMAnalysisStatus.RUNNING
+        if job_id in _llm_results:
+            _llm_results[job_id].status = LLMAnalysisStatus.RUNNING
 
         prompt = _prompt_store.get(prompt_id)
         if not prompt:
-            _llm_results[prompt_id] = LLMAnalysis(
+            _llm_results[job_id] = LLMAnalysis(
                 prompt_id=prompt_id,
                 status=LLMAnalysisStatus.FAILED,
                 error="Prompt not found",
@@ -107,10 +172,10 @@ async def _run_llm_analysis(job_id: str, prompt_id: str) -> None:
         # Run analysis
         result = await analyze_with_llm(prompt)
         result.status = LLMAnalysisStatus.COMPLETED
-        _llm_results[prompt_id] = result
+        _llm_results[job_id] = result
 
     except Exception as e:
-        _llm_results[prompt_id] = LLMAnalysis(
+        _llm_results[job_id] = LLMAnalysis(
             prompt_id=prompt_id,
             status=LLMAnalysisStatus.FAILED,
             error=str(e),
@@ -129,13 +194,13 @@ async def start_llm_analysis(
         raise HTTPException(status_code=404, detail="Prompt not found")
 
     job_id = str(uuid.uuid4())
-    _llm_jobs[job_id] = prompt_id
 
     # Initialize pending result
-    _llm_results[prompt_id] = LLMAnalysis(
+    _llm_results[job_id] = LLMAnalysis(
         prompt_id=prompt_id,
         status=LLMAnalysisStatus.PENDING,
     )
+    _prompt_latest_job[prompt_id] = job_id
 
     # Start background task
     background_tasks.add_task(_run_llm_analysis, job_id, prompt_id)
@@ -146,15 +211,10 @@ async def start_llm_analysis(
 @router.get("/llm/{job_id}/status", response_model=LLMStatusResponse)
 async def get_llm_status(job_id: str) -> LLMStatusResponse:
     """Check the status of an LLM analysis job."""
-    if job_id not in _llm_jobs:
+    result = _llm_results.get(job_id)
+    if result is None:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    prompt_id = _llm_jobs[job_id]
-    result = _llm_results.get(prompt_id)
-
-    if not result:
-        return LLMStatusResponse(job_id=job_id, status=LLMAnalysisStatus.PENDING)
-
     return LLMStatusResponse(
         job_id=job_id,
         status=result.status,
@@ -165,10 +225,11 @@ async def get_llm_status(job_id: str) -> LLMStatusResponse:
 @router.get("/llm/{prompt_id}/result", response_model=LLMAnalysis)
 async def get_llm_result(prompt_id: str) -> LLMAnalysis:
     """Get the LLM analysis result for a prompt."""
-    if prompt_id not in _llm_results:
+    job_id = _prompt_latest_job.get(prompt_id)
+    result = _llm_results.get(job_id) if job_id is not None else None
+    if result is None:
         raise HTTPException(status_code=404, detail="No LLM analysis found for this prompt")
 
-    result = _llm_results[prompt_id]
     if result.status != LLMAnalysisStatus.COMPLETED:
         raise HTTPException(
             status_code=400,
@@ -181,8 +242,6 @@ async def get_llm_result(prompt_id: str) -> LLMAnalysis:
 @router.post("/suggestions", response_model=SuggestionResponse)
 async def generate_suggestions(request: SuggestionRequest) -> SuggestionResponse:
     """Generate improvement suggestions for a prompt."""
-    from backend.services.llm import generate_suggestions
-
     prompt_id = request.prompt_id
 
     if prompt_id not in _prompt_store:
@@ -191,7 +250,8 @@ async def generate_suggestions(request: SuggestionRequest) -> SuggestionResponse
     prompt = _prompt_store[prompt_id]
 
     # Get heuristic analysis if available for context
-    heuristic = _heuristic_results.get(prompt_id)
+    cached = _heuristic_results.get(prompt_id)
+    heuristic = cached[0] if cached is not None else None
 
-    result = await generate_suggestions(prompt, heuristic, request.focus_areas)
+    result = await generate_llm_suggestions(prompt, heuristic, request.focus_areas)
     return result
@@ -1,20 +1,54 @@
 """API routes for prompt management."""
 
+import codecs
+import io
 import uuid
+from typing import Final
 
 from fastapi import APIRouter, HTTPException, UploadFile
 from pydantic import BaseModel
 
 from backend.models.schemas import ParsedFile, Prompt, PromptType
+from backend.services.bounded_dict import BoundedDict
 from cli.parser import parse_markdown_content
 
 router = APIRouter()
 
+# Uploads are read in chunks and rejected once they exceed the size limit
+UPLOAD_CHUNK_SIZE = 64 * 1024
+MAX_UPLOAD_BYTES = 16 * 1024 * 1024
+
+# Accepted values for the inline prompt "type" field
+_TYPE_MAP: Final[dict[str, PromptType]] = {
+    "system": PromptType.SYSTEM,
+    "user": PromptType.USER,
+    "skill": PromptType.SKILL,
+}
+
+# Heading label per prompt type. Skills are exported as user prompts since the
+# parser only recognizes System and User headings.
+_TYPE_LABEL = {
+    PromptType.SYSTEM: "System",
+    PromptType.USER: "User",
+    PromptType.SKILL: "User",
+}
+
 # In-memory storage for parsed prompts (per design decision)
-_prompt_store: dict[str, Prompt] = {}
+_prompt_store: BoundedDict[str, Prompt] = BoundedDict(maxsize=10_000)
 _current_file: ParsedFile | None = None
 
 
+def _store_prompts(prompts: list[Prompt]) -> None:
+    """Replace the stored prompts, dropping analysis results for the old ones."""
+    # Imported here because the analysis routes import this module
+    from backend.routes.analysis import clear_analysis_results
+
+    # Cleared and refilled in place: analysis.py holds a reference to this dict
+    _prompt_store.clear()
+    clear_analysis_results()
+    _prompt_store.update({prompt.id: prompt for prompt in prompts})
+
+
 class PromptUpdate(BaseModel):
     """Request to update a prompt's content."""
 
@@ -44,11 +78,23 @@ async def parse_file(file: UploadFile) -> ParsedFile:
     if not file.filename or not file.filename.endswith(".md"):
         raise HTTPException(status_code=400, detail="File must be a markdown (.md) file")
 
-    content = await file.read()
+    # Decode the upload incrementally so only one copy of the text is held
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = io.StringIO()
+    total_bytes = 0
     try:
-        text = content.decode("utf-8")
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            total_bytes += len(chunk)
+            if total_bytes > MAX_UPLOAD_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"File exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)} MB limit",
+                )
+            buffer.write(decoder.decode(chunk))
+        buffer.write(decoder.decode(b"", final=True))
     except UnicodeDecodeError:
         raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
+    text = buffer.getvalue()
 
     parsed = parse_markdown_content(text, file.filename)
 
@@ -59,9 +105,7 @@ async def parse_file(file: UploadFile) -> ParsedFile:
         )
 
     # Store prompts in memory
-    _prompt_store.clear()
-    for prompt in parsed.prompts:
-        _prompt_store[prompt.id] = prompt
+    _store_prompts(parsed.prompts)
 
     _current_file = parsed
     return parsed
@@ -87,9 +131,7 @@ async def parse_text(body: dict) -> ParsedFile:
         )
 
     # Store prompts in memory
-    _prompt_store.clear()
-    for prompt in parsed.prompts:
-        _prompt_store[prompt.id] = prompt
+    _store_prompts(parsed.prompts)
 
     _current_file = parsed
     return parsed
@@ -110,16 +152,12 @@ async def create_inline_prompt(request: InlinePromptCreate) -> Prompt:
     """Create an inline prompt for analysis without using markdown format."""
     global _prompt_store, _current_file
 
-    if not request.content.strip():
+    content = request.content.strip()
+    if not content:
         raise HTTPException(status_code=400, detail="Content is required")
 
     # Map type string to enum
-    type_map = {
-        "system": PromptType.SYSTEM,
-        "user": PromptType.USER,
-        "skill": PromptType.SKILL,
-    }
-    prompt_type = type_map.get(request.type.lower())
+    prompt_type = _TYPE_MAP.get(request.type.lower())
     if not prompt_type:
         raise HTTPException(
             status_code=400,
@@ -131,15 +169,14 @@ async def create_inline_prompt(request: InlinePromptCreate) -> Prompt:
         id=str(uuid.uuid4()),
         name=request.name,
         type=prompt_type,
-        content=request.content.strip(),
+        content=content,
         line_start=1,
         line_end=request.content.count("\n") + 1,
         metadata=None,
     )
 
     # Store in memory (replaces existing prompts for simplicity)
-    _prompt_store.clear()
-    _prompt_store[prompt.id] = prompt
+    _store_prompts([prompt])
     _current_file = ParsedFile(filename="inline.md", prompts=[prompt])
 
     return prompt
@@ -157,18 +194,17 @@ async def export_prompts(request: ExportRequest) -> dict[str, str]:
     if not prompts:
         raise HTTPException(status_code=400, detail="No matching prompts found")
 
-    # Generate markdown
-    lines = ["# Exported Prompts\n"]
+    # Generate markdown, one section string per prompt
+    sections = ["# Exported Prompts\n"]
     for prompt in prompts:
-        type_label = "System" if prompt.type == "system" else "User"
+        type_label = _TYPE_LABEL[prompt.type]
         if prompt.name != f"{type_label} Prompt":
-            lines.append(f"## {type_label} Prompt: {prompt.name}\n")
+            heading = f"## {type_label} Prompt: {prompt.name}"
         else:
-            lines.append(f"## {type_label} Prompt\n")
-        lines.append(prompt.content)
-        lines.append("\n")
+            heading = f"## {type_label} Prompt"
+        sections.append(f"\n{heading}\n\n{prompt.content}\n\n")
 
-    return {"markdown": "\n".join(lines)}
+    return {"markdown": "".join(sections)}
 
 
 # Path parameter routes come last
@@ -177,6 +213,7 @@ async def get_prompt(prompt_id: str) -> Prompt:
     """Get a single prompt by ID."""
     if prompt_id not in _prompt_store:
         raise HTTPException(status_code=404, detail="Prompt not found")
+    _prompt_store.move_to_end(prompt_id)
     return _prompt_store[prompt_id]
 
 
@@ -187,13 +224,6 @@ async def update_prompt(prompt_id: str, update: PromptUpdate) -> Prompt:
         raise HTTPException(status_code=404, detail="Prompt not found")
 
     prompt = _prompt_store[prompt_id]
-    updated = Prompt(
-        id=prompt.id,
-        name=prompt.name,
-        type=prompt.type,
-        content=update.content,
-        line_start=prompt.line_start,
-        line_end=prompt.line_end,
-    )
+    updated = prompt.model_copy(update={"content": update.content})
     _prompt_store[prompt_id] = updated
     return updated
@@ -0,0 +1,20 @@
+"""Size-bounded dictionary for in-memory stores."""
+
+from collections import OrderedDict
+from typing import Any
+
+
+class BoundedDict(OrderedDict):
+    """OrderedDict that evicts its oldest entries once it exceeds maxsize.
+
+    Call move_to_end(key) on reads to get LRU rather than FIFO eviction.
+    """
+
+    def __init__(self, *args: Any, maxsize: int = 10_000, **kwargs: Any) -> None:
+        self.maxsize = maxsize
+        super().__init__(*args, **kwargs)
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        super().__setitem__(key, value)
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
@@ -1,15 +1,121 @@
 """Configuration loader for heuristic analysis rules."""
 
+import copy
+import re
+from collections.abc import Mapping
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from types import MappingProxyType
+from typing import Any, NamedTuple
 
 import yaml
 
+# Prefer the libyaml C loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # pragma: no cover - depends on the PyYAML build
+    from yaml import SafeLoader as _SafeLoader
 
 # Default config path
 DEFAULT_CONFIG_PATH = Path(__file__).parent.parent.parent / "config" / "default_rules.yaml"
 
+# Term list fields, loadable from YAML config files
+TERM_LIST_FIELDS: tuple[str, ...] = (
+    "vague_terms",
+    "output_format_markers",
+    "guardrail_markers",
+    "example_markers",
+    "role_markers",
+    "context_markers",
+    "task_markers",
+    "flow_markers",
+    "scope_markers",
+    "edge_case_markers",
+    "length_markers",
+    "specific_formats",
+)
+
+# Pattern that never matches, used for empty term lists
+_NEVER_MATCH = re.compile(r"(?!)")
+
+# Non-ASCII characters that re's IGNORECASE matches to a letter with a different
+# lowercase form (dotless i and i, long s and s, final and medial sigma, ...),
+# from the stdlib's re._casefix table
+CASEFIX_RE = re.compile(
+    "[\u00b5\u0131\u017f\u0345\u0390\u03b0\u03b2\u03b5\u03b8\u03b9\u03ba\u03bc"
+    "\u03c0\u03c1\u03c2\u03c3\u03c6\u03d0\u03d1\u03d5\u03d6\u03f0\u03f1\u03f5"
+    "\u0432\u0434\u043e\u0441\u0442\u044a\u0463\u1c80\u1c81\u1c82\u1c83\u1c84"
+    "\u1c85\u1c86\u1c87\u1c88\u1e61\u1e9b\u1fbe\u1fd3\u1fe3\ua64b\ufb05\ufb06]"
+)
+
+
+def _casefix_table() -> dict[int, str]:
+    """Map each CASEFIX_RE character to the smallest character re treats as equal."""
+    chars = [*CASEFIX_RE.pattern[1:-1], "i", "s"]
+    table = {}
+    for char in chars:
+        canonical = min(c for c in chars if re.fullmatch(re.escape(char), c, re.IGNORECASE))
+        if canonical != char:
+            table[ord(char)] = canonical
+    return table
+
+
+_CASEFIX_TABLE = _casefix_table()
+
+
+def fold_case(text: str) -> str:
+    """Lowercase text so that strings re's IGNORECASE treats as equal compare equal."""
+    if text.isascii():
+        return text.lower()
+    # str.lower maps dotted capital I to two characters; re folds it to "i"
+    return text.replace("\u0130", "i").lower().translate(_CASEFIX_TABLE)
+
+
+def compile_terms(terms: tuple[str, ...]) -> re.Pattern[str]:
+    """Compile a term list into a single whole-word alternation pattern.
+
+    Args:
+        terms: Terms to match literally. They are folded with fold_case, and
+               the pattern is meant for lowercased text.
+
+    Returns:
+        Compiled pattern (never matches if terms is empty).
+    """
+    if not terms:
+        return _NEVER_MATCH
+    # Longest first so alternation prefers the longest term at a position
+    unique_terms = sorted(dict.fromkeys(fold_case(t) for t in terms), key=len, reverse=True)
+    alternation = "|".join(re.escape(t) for t in unique_terms)
+    return re.compile(rf"\b(?:{alternation})\b")
+
+
+class ResolvedWeights(NamedTuple):
+    """Dimension weights for one prompt kind, with defaults applied."""
+
+    clarity: float
+    specificity: float
+    structure: float
+    completeness: float
+    output_format: float
+    guardrails: float
+    total: float
+
+
+def resolve_weights(
+    weights: Mapping[str, float], guardrails_key: str, guardrails_default: float
+) -> ResolvedWeights:
+    """Resolve dimension weights (and their sum) from a weights mapping."""
+    values = (
+        weights.get("clarity", 1.0),
+        weights.get("specificity", 1.0),
+        weights.get("structure", 0.8),
+        weights.get("completeness", 1.2),
+        weights.get("output_format", 0.8),
+        weights.get(guardrails_key, guardrails_default),
+    )
+    return ResolvedWeights(*values, total=sum(values))
+
 
 @dataclass
 class AnalysisConfig:
@@ -22,8 +128,9 @@ class AnalysisConfig:
     min_word_count: int = 20
     max_sentence_length: int = 40
 
-    # Dimension weights
-    weights: dict[str, float] = field(default_factory=lambda: {
+    # Dimension weights; stored read-only so the resolved weights below cannot
+    # go stale. Assign a new mapping to change them.
+    weights: Mapping[str, float] = field(default_factory=lambda: {
         "clarity": 1.0,
         "specificity": 1.0,
         "structure": 0.8,
@@ -97,6 +204,29 @@ class AnalysisConfig:
         "json", "xml", "yaml", "markdown", "html", "csv", "table",
     )
 
+    # Derived from vague_terms and kept in sync by __setattr__; matches the
+    # terms as whole words in lowercased content
+    vague_pattern: re.Pattern[str] = field(init=False, repr=False, compare=False)
+
+    # Resolved from weights; guardrails weigh more for system and skill prompts
+    system_weights: ResolvedWeights = field(init=False, repr=False, compare=False)
+    user_weights: ResolvedWeights = field(init=False, repr=False, compare=False)
+
+    # Identifies this exact configuration state for result caches; replaced on
+    # every field assignment so cached analyses never outlive the values used
+    cache_token: object = field(init=False, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name == "weights":
+            value = MappingProxyType(dict(value))
+        super().__setattr__(name, value)
+        super().__setattr__("cache_token", object())
+        if name == "weights":
+            super().__setattr__("system_weights", resolve_weights(value, "guardrails_system", 1.2))
+            super().__setattr__("user_weights", resolve_weights(value, "guardrails_user", 0.6))
+        elif name == "vague_terms":
+            super().__setattr__("vague_pattern", compile_terms(value))
+
     @classmethod
     def from_yaml(cls, path: Path | str) -> "AnalysisConfig":
         """Load configuration from a YAML file.
@@ -115,8 +245,7 @@ class AnalysisConfig:
         if not path.exists():
             raise FileNotFoundError(f"Config file not found: {path}")
 
-        with open(path) as f:
-            data = yaml.safe_load(f) or {}
+        data = _load_yaml(path)
 
         return cls._from_dict(data)
 
@@ -124,36 +253,35 @@ class AnalysisConfig:
     def _from_dict(cls, data: dict[str, Any]) -> "AnalysisConfig":
         """Create config from a dictionary."""
         config = cls()
+        config._apply(data)
+        return config
+
+    def _apply(self, data: dict[str, Any]) -> None:
+        """Apply values from a config dictionary to this config in place.
 
+        Dict-valued fields are rebound to new dicts rather than mutated, so a
+        shallow copy of a config can be updated without touching the original.
+        """
         # Load thresholds
         if "thresholds" in data:
             thresholds = data["thresholds"]
             if "min_word_count" in thresholds:
-                config.min_word_count = thresholds["min_word_count"]
+                self.min_word_count = thresholds["min_word_count"]
             if "max_sentence_length" in thresholds:
-                config.max_sentence_length = thresholds["max_sentence_length"]
+                self.max_sentence_length = thresholds["max_sentence_length"]
 
         # Load weights
         if "weights" in data:
-            config.weights = {**config.weights, **data["weights"]}
+            self.weights = {**self.weights, **data["weights"]}
 
         # Load score labels
         if "score_labels" in data:
-            config.score_labels = {**config.score_labels, **data["score_labels"]}
+            self.score_labels = {**self.score_labels, **data["score_labels"]}
 
         # Load term lists (convert lists to tuples)
-        list_fields = [
-            "vague_terms", "output_format_markers", "guardrail_markers",
-            "example_markers", "role_markers", "context_markers",
-            "task_markers", "flow_markers", "scope_markers",
-            "edge_case_markers", "length_markers", "specific_formats",
-        ]
-
-        for field_name in list_fields:
+        for field_name in TERM_LIST_FIELDS:
             if field_name in data and isinstance(data[field_name], list):
-                setattr(config, field_name, tuple(data[field_name]))
-
-        return config
+                setattr(self, field_name, tuple(data[field_name]))
 
     def merge_with(self, override_path: Path | str) -> "AnalysisConfig":
         """Merge this config with overrides from another file.
@@ -170,16 +298,13 @@ class AnalysisConfig:
         if not override_path.exists():
             raise FileNotFoundError(f"Override config not found: {override_path}")
 
-        with open(override_path) as f:
-            override_data = yaml.safe_load(f) or {}
-
-        # Start with current config as dict
-        merged = self._to_dict()
-
-        # Deep merge override data
-        _deep_merge(merged, override_data)
+        override_data = _load_yaml(override_path)
 
-        return self._from_dict(merged)
+        # Apply overrides to a shallow copy; untouched fields and their
+        # derived values are shared with this config
+        merged = copy.copy(self)
+        merged._apply(override_data)
+        return merged
 
     def _to_dict(self) -> dict[str, Any]:
         """Convert config to dictionary."""
@@ -217,13 +342,19 @@ class AnalysisConfig:
             yaml.dump(self._to_dict(), f, default_flow_style=False, sort_keys=False)
 
 
-def _deep_merge(base: dict, override: dict) -> None:
-    """Deep merge override dict into base dict in place."""
-    for key, value in override.items():
-        if key in base and isinstance(base[key], dict) and isinstance(value, dict):
-            _deep_merge(base[key], value)
-        else:
-            base[key] = value
+def _load_yaml(path: Path) -> dict[str, Any]:
+    """Load a YAML file, reusing the parsed result while the file is unchanged.
+
+    The returned dict is shared between callers and must not be mutated.
+    """
+    return _load_yaml_cached(str(path.resolve()), path.stat().st_mtime_ns)
+
+
+@lru_cache(maxsize=8)
+def _load_yaml_cached(path_str: str, mtime_ns: int) -> dict[str, Any]:
+    """Parse a YAML file. mtime_ns is only part of the cache key."""
+    with open(path_str) as f:
+        return yaml.load(f, Loader=_SafeLoader) or {}
 
 
 def load_config(path: Path | str | None = None) -> AnalysisConfig:
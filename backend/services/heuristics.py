@@ -1,11 +1,37 @@
 """Heuristic analysis engine for evaluating prompts."""
 
+import math
 import re
+from bisect import bisect_right
+from collections.abc import Sequence
+from dataclasses import dataclass, replace
+from functools import lru_cache
 
-import textstat
+from pyphen import Pyphen
 
 from backend.models.schemas import DimensionScore, HeuristicAnalysis, Issue, Prompt, PromptType
-from backend.services.config import AnalysisConfig, get_config
+from backend.services.bounded_dict import BoundedDict
+from backend.services.config import CASEFIX_RE, AnalysisConfig, fold_case, get_config
+
+# Use the third-party regex engine when installed
+try:
+    import regex as regex_engine
+except ImportError:  # pragma: no cover - optional dependency
+    regex_engine = re
+
+# Patterns used on every analysis, compiled once at import
+_SENT_SPLIT_RE = re.compile(r"[.!?]+")
+# Whitespace excludes newlines so matches never span lines when the pattern is
+# run over the whole content.
+# Case-insensitive patterns are written for lowercased text; see scan_target.
+_PASSIVE_RE = regex_engine.compile(r"\b(is|are|was|were|been|being)[^\S\n]+\w+ed\b")
+_PRONOUN_RE = regex_engine.compile(r"\b(it|this|that|these|those)\b")
+_NUMBER_RE = re.compile(r"\b\d+\b")
+_NUMBERED_LIST_RE = re.compile(r"^\s*\d+\.")
+_QUANTITY_RE = re.compile(r"at least|at most|maximum|minimum|up to|no more than")
+_NEWLINE_RE = re.compile("\n")
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_FLESCH_SENT_RE = re.compile(r"\b[^.!?]+[.!?]*")
 
 
 def find_line_number(content: str, search_text: str, start_line: int) -> int | None:
@@ -18,48 +44,169 @@ def find_line_number(content: str, search_text: str, start_line: int) -> int | N
     return None
 
 
-def find_pattern_lines(content: str, pattern: str, start_line: int) -> list[tuple[int, str]]:
-    """Find all lines matching a regex pattern, returning (line_num, snippet) pairs."""
-    lines = content.split("\n")
+@dataclass(frozen=True, slots=True)
+class PromptView:
+    """Derived forms of a prompt's content, computed once per analysis."""
+
+    content: str
+    content_lower: str
+    lines: tuple[str, ...]
+    newline_offsets: tuple[int, ...]
+    word_count: int
+    # Whether scanning content_lower without IGNORECASE finds the same matches,
+    # at the same offsets, as scanning content with IGNORECASE
+    lower_scannable: bool
+
+    @classmethod
+    def from_prompt(cls, prompt: Prompt) -> "PromptView":
+        """Build the view for a prompt."""
+        content = prompt.content
+        content_lower = content.lower()
+        return cls(
+            content=content,
+            content_lower=content_lower,
+            lines=tuple(content.split("\n")),
+            newline_offsets=tuple(m.start() for m in _NEWLINE_RE.finditer(content)),
+            word_count=len(content.split()),
+            lower_scannable=content_lower.isascii()
+            or (len(content_lower) == len(content) and not CASEFIX_RE.search(content_lower)),
+        )
+
+
+@lru_cache(maxsize=64)
+def _lower_scannable(regex: re.Pattern[str]) -> bool:
+    """Whether a lowercase pattern can run over lowercased text in place of IGNORECASE."""
+    return CASEFIX_RE.search(regex.pattern) is None
+
+
+@lru_cache(maxsize=64)
+def _ignorecase(regex: re.Pattern[str]) -> re.Pattern[str]:
+    """Recompile a lowercase pattern with re and IGNORECASE for original-case text."""
+    return re.compile(regex.pattern, re.IGNORECASE)
+
+
+def scan_target(view: PromptView, regex: re.Pattern[str]) -> tuple[str, re.Pattern[str]]:
+    """Choose the text and pattern for a case-insensitive scan.
+
+    Patterns are written for lowercased text and normally run on content_lower
+    without IGNORECASE. That finds the same matches as
+    IGNORECASE unless lowercasing changed the length or either side contains a
+    character re folds specially; then content is scanned with IGNORECASE.
+    """
+    if view.lower_scannable and _lower_scannable(regex):
+        return view.content_lower, regex
+    return view.content, _ignorecase(regex)
+
+
+def contains_any(text: str, markers: tuple[str, ...]) -> bool:
+    """Check whether any marker occurs in text as a substring."""
+    return any(marker in text for marker in markers)
+
+
+@lru_cache(maxsize=1)
+def _hyphenator() -> Pyphen:
+    """Load the English hyphenation dictionary on first use."""
+    return Pyphen(lang="en_US")
+
+
+def _round_half_away(number: float, points: int) -> float:
+    """Round half away from zero, as textstat does."""
+    scale = 10 ** points
+    return math.floor(number * scale + math.copysign(0.5, number)) / scale
+
+
+@lru_cache(maxsize=1024)
+def flesch_reading_ease(content: str) -> float:
+    """Flesch Reading Ease of content, cached since prompts are re-analyzed often.
+
+    Reproduces textstat's English scoring (punctuation stripped, sentences of
+    two words or fewer ignored, pyphen syllable counts, rounded averages) in a
+    single pass over the text, without importing textstat.
+    """
+    word_count = len(_PUNCT_RE.sub("", content).split())
+    if not word_count:
+        return _round_half_away(206.835, 2)
+
+    sentences = _FLESCH_SENT_RE.findall(content)
+    short = sum(1 for s in sentences if len(_PUNCT_RE.sub("", s).split()) <= 2)
+    sentence_count = max(1, len(sentences) - short)
+
+    positions = _hyphenator().positions
+    syllables = sum(
+        len(positions(word)) + 1
+        for word in _PUNCT_RE.sub("", content.lower()).split()
+    )
+
+    avg_sentence_length = _round_half_away(word_count / sentence_count, 1)
+    avg_syllables = _round_half_away(syllables / word_count, 1)
+    score = 206.835 - 1.015 * avg_sentence_length - 84.6 * avg_syllables
+    return _round_half_away(score, 2)
+
+
+def find_pattern_lines(
+    view: PromptView, regex: re.Pattern[str], start_line: int
+) -> list[tuple[int, str]]:
+    """Find all lines matching a compiled pattern, returning (line_num, snippet) pairs.
+
+    Searches the whole content rather than each line, mapping match offsets to
+    lines via the newline offsets. After a hit the search resumes at the next
+    line, so each line still contributes at most its first match.
+    """
+    content = view.content
+    text, regex = scan_target(view, regex)
+    offsets = view.newline_offsets
+    last_line = len(offsets)
     results = []
-    regex = re.compile(pattern, re.IGNORECASE)
-    for idx, line in enumerate(lines):
-        match = regex.search(line)
-        if match:
-            results.append((start_line + idx, match.group(0)))
+    pos = 0
+    while (match := regex.search(text, pos)) is not None:
+        start, end = match.span()
+        idx = bisect_right(offsets, start)
+        results.append((start_line + idx, content[start:end]))
+        if idx == last_line:
+            break
+        pos = offsets[idx] + 1
     return results
 
 
-def analyze_clarity(prompt: Prompt, config: AnalysisConfig) -> DimensionScore:
+def analyze_clarity(
+    prompt: Prompt, view: PromptView, config: AnalysisConfig
+) -> DimensionScore:
     """Analyze prompt clarity based on readability and sentence structure."""
-    content = prompt.content
+    content = view.content
     start_line = prompt.line_start
     issues: list[Issue] = []
     suggestions: list[str] = []
 
     # Calculate readability score using Flesch Reading Ease
-    flesch_score = textstat.flesch_reading_ease(content)
-
-    # Check sentence length - find long sentences with line numbers
-    lines = content.split("\n")
-    for idx, line in enumerate(lines):
-        sentences = re.split(r"[.!?]+", line)
+    flesch_score = flesch_reading_ease(content)
+
+    # Check sentence length - find long sentences with line numbers. A sentence
+    # of n characters holds at most (n + 1) // 2 words, so shorter ones are
+    # skipped without splitting them into a word list.
+    max_length = config.max_sentence_length
+    min_chars = 2 * max_length + 1
+    had_long_sentence = False
+    for idx, line in enumerate(view.lines):
+        if len(line) < min_chars:
+            continue
+        sentences = _SENT_SPLIT_RE.split(line)
         for sentence in sentences:
+            if len(sentence) < min_chars:
+                continue
             word_count = len(sentence.split())
-            if word_count > config.max_sentence_length:
+            if word_count > max_length:
+                had_long_sentence = True
                 issues.append(Issue(
                     message=f"Overly long sentence ({word_count} words)",
                     line=start_line + idx,
                     snippet=sentence[:60] + "..." if len(sentence) > 60 else sentence
                 ))
 
-    if any(i.message.startswith("Overly long") for i in issues):
+    if had_long_sentence:
         suggestions.append("Break long sentences into shorter, clearer ones")
 
     # Check for passive voice indicators with line numbers
-    passive_matches = find_pattern_lines(
-        content, r"\b(is|are|was|were|been|being)\s+\w+ed\b", start_line
-    )
+    passive_matches = find_pattern_lines(view, _PASSIVE_RE, start_line)
     if len(passive_matches) > 2:
         for line_num, snippet in passive_matches[:3]:  # Report first 3
             issues.append(Issue(
@@ -70,7 +217,7 @@ def analyze_clarity(prompt: Prompt, config: AnalysisConfig) -> DimensionScore:
         suggestions.append("Use active voice for clearer instructions")
 
     # Check for ambiguous pronouns with line numbers
-    pronoun_matches = find_pattern_lines(content, r"\b(it|this|that|these|those)\b", start_line)
+    pronoun_matches = find_pattern_lines(view, _PRONOUN_RE, start_line)
     if len(pronoun_matches) > 5:
         issues.append(Issue(
             message=f"High use of pronouns ({len(pronoun_matches)}) may cause ambiguity",
@@ -98,31 +245,44 @@ def analyze_clarity(prompt: Prompt, config: AnalysisConfig) -> DimensionScore:
     return DimensionScore(score=score, issues=issues, suggestions=suggestions)
 
 
-def analyze_specificity(prompt: Prompt, config: AnalysisConfig) -> DimensionScore:
+def analyze_specificity(
+    prompt: Prompt, view: PromptView, config: AnalysisConfig
+) -> DimensionScore:
     """Analyze how specific and concrete the prompt is."""
-    content = prompt.content
     start_line = prompt.line_start
     issues: list[Issue] = []
     suggestions: list[str] = []
 
-    # Check for vague terms with line numbers
+    # Check for vague terms with line numbers. One pass of the fused pattern
+    # over the whole content collects the first hit of each term per line...
+    content = view.content
+    text, pattern = scan_target(view, config.vague_pattern)
+    offsets = view.newline_offsets
+    term_lines: dict[str, list[tuple[int, str]]] = {}
+    seen: set[tuple[int, str]] = set()
+    for match in pattern.finditer(text):
+        start, end = match.span()
+        key = fold_case(match.group(0))
+        idx = bisect_right(offsets, start)
+        if (idx, key) not in seen:
+            seen.add((idx, key))
+            term_lines.setdefault(key, []).append((start_line + idx, content[start:end]))
+
+    # ...then issues are reported in config term order, as before
     for term in config.vague_terms:
-        matches = find_pattern_lines(content, rf"\b{term}\b", start_line)
-        for line_num, snippet in matches:
+        for line_num, snippet in term_lines.get(fold_case(term), ()):
             issues.append(Issue(
                 message=f"Vague term: '{term}'",
                 line=line_num,
                 snippet=snippet
             ))
 
-    if any(i.message.startswith("Vague term") for i in issues):
+    vague_count = len(issues)
+    if vague_count:
         suggestions.append("Replace vague terms with specific criteria or examples")
 
     # Check for concrete examples
-    has_examples = any(
-        marker in content.lower()
-        for marker in config.example_markers
-    )
+    has_examples = contains_any(view.content_lower, config.example_markers)
     if not has_examples:
         issues.append(Issue(
             message="No examples provided",
@@ -132,11 +292,8 @@ def analyze_specificity(prompt: Prompt, config: AnalysisConfig) -> DimensionScor
         suggestions.append("Add concrete examples to clarify expectations")
 
     # Check for quantifiable criteria
-    has_numbers = bool(re.search(r"\b\d+\b", content))
-    has_quantities = any(
-        q in content.lower()
-        for q in ["at least", "at most", "maximum", "minimum", "up to", "no more than"]
-    )
+    has_numbers = _NUMBER_RE.search(view.content) is not None
+    has_quantities = _QUANTITY_RE.search(view.content_lower) is not None
     if not has_numbers and not has_quantities:
         issues.append(Issue(
             message="No quantifiable criteria found",
@@ -146,7 +303,6 @@ def analyze_specificity(prompt: Prompt, config: AnalysisConfig) -> DimensionScor
         suggestions.append("Add specific numbers or quantities where applicable")
 
     # Calculate score
-    vague_count = sum(1 for i in issues if i.message.startswith("Vague term"))
     base_score = 100
     penalty = vague_count * 5 + (15 if not has_examples else 0) + (10 if not has_numbers else 0)
     score = max(0, base_score - penalty)
@@ -154,19 +310,20 @@ def analyze_specificity(prompt: Prompt, config: AnalysisConfig) -> DimensionScor
     return DimensionScore(score=score, issues=issues, suggestions=suggestions)
 
 
-def analyze_structure(prompt: Prompt, config: AnalysisConfig) -> DimensionScore:
+def analyze_structure(
+    prompt: Prompt, view: PromptView, config: AnalysisConfig
+) -> DimensionScore:
     """Analyze the organizational structure of the prompt."""
-    content = prompt.content
     start_line = prompt.line_start
     issues: list[Issue] = []
     suggestions: list[str] = []
 
-    lines = content.split("\n")
-    word_count = len(content.split())
+    lines = view.lines
+    word_count = view.word_count
 
     # Check for structural elements
     has_lists = any(line.strip().startswith(("-", "*", "•")) for line in lines)
-    has_numbered = any(re.match(r"^\s*\d+\.", line) for line in lines)
+    has_numbered = any(_NUMBERED_LIST_RE.match(line) for line in lines)
     has_sections = any(line.strip().startswith("#") for line in lines)
 
     # Long prompts should have structure
@@ -179,7 +336,7 @@ def analyze_structure(prompt: Prompt, config: AnalysisConfig) -> DimensionScore:
         suggestions.append("Break content into sections or bullet points")
 
     # Check for logical flow markers
-    has_flow = any(marker in content.lower() for marker in config.flow_markers)
+    has_flow = contains_any(view.content_lower, config.flow_markers)
     if word_count > 50 and not has_flow and not has_numbered:
         issues.append(Issue(
             message="No clear sequence or flow indicators",
@@ -213,15 +370,16 @@ def analyze_structure(prompt: Prompt, config: AnalysisConfig) -> DimensionScore:
     return DimensionScore(score=score, issues=issues, suggestions=suggestions)
 
 
-def analyze_completeness(prompt: Prompt, config: AnalysisConfig) -> DimensionScore:
+def analyze_completeness(
+    prompt: Prompt, view: PromptView, config: AnalysisConfig
+) -> DimensionScore:
     """Analyze whether the prompt provides sufficient context."""
-    content = prompt.content
-    content_lower = content.lower()
+    content_lower = view.content_lower
     start_line = prompt.line_start
     issues: list[Issue] = []
     suggestions: list[str] = []
 
-    word_count = len(content.split())
+    word_count = view.word_count
 
     # Check minimum content
     if word_count < config.min_word_count:
@@ -234,7 +392,7 @@ def analyze_completeness(prompt: Prompt, config: AnalysisConfig) -> DimensionSco
 
     # Check for role/persona definition (important for system prompts)
     if prompt.type == PromptType.SYSTEM or prompt.type == PromptType.SKILL:
-        has_role = any(marker in content_lower for marker in config.role_markers)
+        has_role = contains_any(content_lower, config.role_markers)
         if not has_role:
             issues.append(Issue(
                 message="No clear role or persona defined",
@@ -244,7 +402,7 @@ def analyze_completeness(prompt: Prompt, config: AnalysisConfig) -> DimensionSco
             suggestions.append("Start with 'You are...' to establish the assistant's role")
 
     # Check for context/background
-    has_context = any(marker in content_lower for marker in config.context_markers)
+    has_context = contains_any(content_lower, config.context_markers)
     if not has_context and word_count > 30:
         issues.append(Issue(
             message="No explicit context or background provided",
@@ -254,7 +412,7 @@ def analyze_completeness(prompt: Prompt, config: AnalysisConfig) -> DimensionSco
         suggestions.append("Add context about the situation or domain")
 
     # Check for task definition
-    has_task = any(marker in content_lower for marker in config.task_markers)
+    has_task = contains_any(content_lower, config.task_markers)
     if not has_task:
         issues.append(Issue(
             message="No clear task or objective stated",
@@ -276,16 +434,16 @@ def analyze_completeness(prompt: Prompt, config: AnalysisConfig) -> DimensionSco
     return DimensionScore(score=score, issues=issues, suggestions=suggestions)
 
 
-def analyze_output_format(prompt: Prompt, config: AnalysisConfig) -> DimensionScore:
+def analyze_output_format(
+    prompt: Prompt, view: PromptView, config: AnalysisConfig
+) -> DimensionScore:
     """Analyze whether the prompt specifies expected output format."""
-    content = prompt.content
-    content_lower = content.lower()
+    content_lower = view.content_lower
     issues: list[Issue] = []
     suggestions: list[str] = []
 
     # Check for format specifications
-    format_markers = config.output_format_markers
-    has_format = any(marker in content_lower for marker in format_markers)
+    has_format = contains_any(content_lower, config.output_format_markers)
 
     if not has_format:
         issues.append(Issue(
@@ -296,10 +454,10 @@ def analyze_output_format(prompt: Prompt, config: AnalysisConfig) -> DimensionSc
         suggestions.append("Specify how you want the response formatted (JSON, list, paragraph, etc.)")
 
     # Check for specific format types
-    has_specific = any(fmt in content_lower for fmt in config.specific_formats)
+    has_specific = contains_any(content_lower, config.specific_formats)
 
     # Check for length expectations
-    has_length = any(marker in content_lower for marker in config.length_markers)
+    has_length = contains_any(content_lower, config.length_markers)
 
     if not has_length:
         issues.append(Issue(
@@ -326,17 +484,17 @@ def analyze_output_format(prompt: Prompt, config: AnalysisConfig) -> DimensionSc
     return DimensionScore(score=score, issues=issues, suggestions=suggestions)
 
 
-def analyze_guardrails(prompt: Prompt, config: AnalysisConfig) -> DimensionScore:
+def analyze_guardrails(
+    prompt: Prompt, view: PromptView, config: AnalysisConfig
+) -> DimensionScore:
     """Analyze safety constraints and boundary definitions."""
-    content = prompt.content
-    content_lower = content.lower()
+    content_lower = view.content_lower
     start_line = prompt.line_start
     issues: list[Issue] = []
     suggestions: list[str] = []
 
     # Check for guardrail markers
-    guardrail_markers = config.guardrail_markers
-    has_guardrails = any(marker in content_lower for marker in guardrail_markers)
+    has_guardrails = contains_any(content_lower, config.guardrail_markers)
 
     # System prompts and skills should have guardrails
     if prompt.type == PromptType.SYSTEM or prompt.type == PromptType.SKILL:
@@ -349,7 +507,7 @@ def analyze_guardrails(prompt: Prompt, config: AnalysisConfig) -> DimensionScore
             suggestions.append("Add boundaries (e.g., 'Never share sensitive information', 'Only discuss topics related to...')")
 
         # Check for edge case handling
-        has_edge_handling = any(marker in content_lower for marker in config.edge_case_markers)
+        has_edge_handling = contains_any(content_lower, config.edge_case_markers)
         if not has_edge_handling:
             issues.append(Issue(
                 message="No edge case handling defined",
@@ -359,7 +517,7 @@ def analyze_guardrails(prompt: Prompt, config: AnalysisConfig) -> DimensionScore
             suggestions.append("Add instructions for handling edge cases or unexpected inputs")
 
     # Check for scope definition
-    has_scope = any(marker in content_lower for marker in config.scope_markers)
+    has_scope = contains_any(content_lower, config.scope_markers)
     if not has_scope and (prompt.type == PromptType.SYSTEM or prompt.type == PromptType.SKILL):
         issues.append(Issue(
             message="No clear scope boundaries defined",
@@ -391,6 +549,12 @@ def analyze_guardrails(prompt: Prompt, config: AnalysisConfig) -> DimensionScore
     return DimensionScore(score=score, issues=issues, suggestions=suggestions)
 
 
+# Heuristic results keyed by (config.cache_token, type, line_start, content).
+# Cached DimensionScores are shared between results and must not be mutated.
+# Reads skip move_to_end so concurrent worker threads cannot race on eviction.
+_analysis_cache: BoundedDict = BoundedDict(maxsize=1024)
+
+
 def analyze_prompt(prompt: Prompt, config: AnalysisConfig | None = None) -> HeuristicAnalysis:
     """Run full heuristic analysis on a prompt.
 
@@ -405,41 +569,39 @@ def analyze_prompt(prompt: Prompt, config: AnalysisConfig | None = None) -> Heur
     if config is None:
         config = get_config()
 
-    clarity = analyze_clarity(prompt, config)
-    specificity = analyze_specificity(prompt, config)
-    structure = analyze_structure(prompt, config)
-    completeness = analyze_completeness(prompt, config)
-    output_format = analyze_output_format(prompt, config)
-    guardrails = analyze_guardrails(prompt, config)
+    # Everything but prompt_id is a function of these, so re-analyzing the same
+    # prompt (reload, repeated CLI runs in one process) is a dict lookup
+    key = (config.cache_token, prompt.type, prompt.line_start, prompt.content)
+    cached = _analysis_cache.get(key)
+    if cached is not None:
+        return replace(cached, prompt_id=prompt.id)
+
+    view = PromptView.from_prompt(prompt)
+
+    clarity = analyze_clarity(prompt, view, config)
+    specificity = analyze_specificity(prompt, view, config)
+    structure = analyze_structure(prompt, view, config)
+    completeness = analyze_completeness(prompt, view, config)
+    output_format = analyze_output_format(prompt, view, config)
+    guardrails = analyze_guardrails(prompt, view, config)
 
     # Calculate overall score as weighted average using config weights
-    guardrails_weight = (
-        config.weights.get("guardrails_system", 1.2)
+    weights = (
+        config.system_weights
         if prompt.type in (PromptType.SYSTEM, PromptType.SKILL)
-        else config.weights.get("guardrails_user", 0.6)
+        else config.user_weights
     )
-
-    weights = {
-        "clarity": config.weights.get("clarity", 1.0),
-        "specificity": config.weights.get("specificity", 1.0),
-        "structure": config.weights.get("structure", 0.8),
-        "completeness": config.weights.get("completeness", 1.2),
-        "output_format": config.weights.get("output_format", 0.8),
-        "guardrails": guardrails_weight,
-    }
-
-    total_weight = sum(weights.values())
     weighted_sum = (
-        clarity.score * weights["clarity"]
-        + specificity.score * weights["specificity"]
-        + structure.score * weights["structure"]
-        + completeness.score * weights["completeness"]
-        + output_format.score * weights["output_format"]
-        + guardrails.score * weights["guardrails"]
+        clarity.score * weights.clarity
+        + specificity.score * weights.specificity
+        + structure.score * weights.structure
+        + completeness.score * weights.completeness
+        + output_format.score * weights.output_format
+        + guardrails.score * weights.guardrails
     )
-    overall_score = int(weighted_sum / total_weight)
+    overall_score = int(weighted_sum / weights.total)
 
-    return HeuristicAnalysis(
+    analysis = HeuristicAnalysis(
         prompt_id=prompt.id,
         overall_score=overall_score,
         clarity=clarity,
@@ -449,3 +611,23 @@ def analyze_prompt(prompt: Prompt, config: AnalysisConfig | None = None) -> Heur
         output_format=output_format,
         guardrails=guardrails,
     )
+    _analysis_cache[key] = analysis
+    return analysis
+
+
+def analyze_prompts(
+    prompts: Sequence[Prompt], config: AnalysisConfig | None = None
+) -> list[HeuristicAnalysis]:
+    """Run full heuristic analysis on several prompts.
+
+    Args:
+        prompts: The prompts to analyze.
+        config: Optional configuration for analysis thresholds.
+                If None, uses the global config (loaded from YAML or defaults).
+
+    Returns:
+        One HeuristicAnalysis per prompt, in input order.
+    """
+    if config is None:
+        config = get_config()
+    return [analyze_prompt(prompt, config) for prompt in prompts]
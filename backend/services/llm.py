@@ -1,25 +1,35 @@
 """LLM-powered analysis using Claude API."""
 
-import json
+import asyncio
+import hashlib
 import os
+import re
+from dataclasses import replace
 from typing import Any
 
 import anthropic
+import orjson
 
 from backend.models.schemas import HeuristicAnalysis, LLMAnalysis, Prompt, PromptType
+from backend.services.bounded_dict import BoundedDict
 
-# Initialize client (uses ANTHROPIC_API_KEY env var)
-_client: anthropic.Anthropic | None = None
+# Initialize client (uses ANTHROPIC_API_KEY env var). The async client's
+# connection pool is tied to the event loop it was created on, so a new one is
+# made when called from a different loop (e.g. successive asyncio.run calls).
+_client: anthropic.AsyncAnthropic | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
 
 
-def get_client() -> anthropic.Anthropic:
-    """Get or create the Anthropic client."""
-    global _client
-    if _client is None:
+def get_client() -> anthropic.AsyncAnthropic:
+    """Get or create the Anthropic client for the running event loop."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
         api_key = os.environ.get("ANTHROPIC_API_KEY")
         if not api_key:
             raise ValueError("ANTHROPIC_API_KEY environment variable not set")
-        _client = anthropic.Anthropic(api_key=api_key)
+        _client = anthropic.AsyncAnthropic(api_key=api_key)
+        _client_loop = loop
     return _client
 
 
@@ -68,17 +78,31 @@ Respond in JSON format:
 }"""
 
 
-async def analyze_with_llm(prompt: Prompt) -> LLMAnalysis:
-    """Analyze a prompt using Claude.
+def _cached_system(text: str) -> list[dict[str, Any]]:
+    """Wrap a fixed system prompt as a block marked for prompt caching."""
+    return [{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}]
 
-    Args:
-        prompt: The prompt to analyze.
 
-    Returns:
-        LLMAnalysis with detected issues and suggestions.
-    """
-    client = get_client()
+_ANALYSIS_SYSTEM = _cached_system(ANALYSIS_SYSTEM_PROMPT)
+_SUGGESTION_SYSTEM = _cached_system(SUGGESTION_SYSTEM_PROMPT)
+
+# Fenced code blocks in model responses; an unterminated fence runs to the end
+_JSON_FENCE_RE = re.compile(r"```json(.*?)(?:```|\Z)", re.DOTALL)
+_FENCE_RE = re.compile(r"```(.*?)(?:```|\Z)", re.DOTALL)
+
+# Successful responses keyed by request hash, so identical prompts (e.g. shared
+# across files) are not re-sent to the API within a process
+_response_cache: BoundedDict[str, Any] = BoundedDict(maxsize=1024)
 
+# Seconds between status checks while a message batch is processing
+BATCH_POLL_INTERVAL = 10.0
+
+# Maximum analysis requests in flight at once when analyzing many prompts
+LLM_CONCURRENCY = 8
+
+
+def _analysis_params(prompt: Prompt) -> dict[str, Any]:
+    """Build the Messages API parameters for analyzing a prompt."""
     prompt_type = "system prompt" if prompt.type == PromptType.SYSTEM else "user prompt"
 
     user_message = f"""Analyze this {prompt_type}:
@@ -89,48 +113,196 @@ async def analyze_with_llm(prompt: Prompt) -> LLMAnalysis:
 
 Provide your analysis in the specified JSON format."""
 
-    try:
-        response = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=2000,
-            system=ANALYSIS_SYSTEM_PROMPT,
-            messages=[{"role": "user", "content": user_message}],
-        )
+    return {
+        "model": "claude-sonnet-4-20250514",
+        "max_tokens": 2000,
+        "system": _ANALYSIS_SYSTEM,
+        "messages": [{"role": "user", "content": user_message}],
+    }
 
-        # Parse the response
-        response_text = response.content[0].text
 
-        # Extract JSON from response (handle markdown code blocks)
-        if "```json" in response_text:
-            json_str = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            json_str = response_text.split("```")[1].split("```")[0].strip()
-        else:
-            json_str = response_text.strip()
+def _request_key(params: dict[str, Any]) -> str:
+    """Hash the full request parameters, which determine the response."""
+    return hashlib.sha256(orjson.dumps(params)).hexdigest()
 
-        data = json.loads(json_str)
 
-        return LLMAnalysis(
-            prompt_id=prompt.id,
-            ambiguities=data.get("ambiguities", []),
-            missing_context=data.get("missing_context", []),
-            injection_risks=data.get("injection_risks", []),
-            best_practice_issues=data.get("best_practice_issues", []),
-            suggested_revision=data.get("suggested_revision"),
-            revision_explanation=data.get("revision_explanation"),
-        )
+def _cached_analysis(key: str, prompt_id: str) -> LLMAnalysis | None:
+    """Return a copy of a cached analysis for prompt_id, if there is one."""
+    cached = _response_cache.get(key)
+    if cached is None:
+        return None
+    _response_cache.move_to_end(key)
+    return replace(cached, prompt_id=prompt_id)
+
 
-    except json.JSONDecodeError as e:
+def _cache_analysis(key: str, analysis: LLMAnalysis) -> None:
+    """Cache a successful analysis; callers update the returned instance."""
+    if analysis.error is None:
+        _response_cache[key] = replace(analysis)
+
+
+async def _stream_text(client: anthropic.AsyncAnthropic, params: dict[str, Any]) -> str:
+    """Stream a message and return the text of its first content block."""
+    async with client.messages.stream(**params) as stream:
+        message = await stream.get_final_message()
+    return message.content[0].text
+
+
+def _extract_json(response_text: str) -> str:
+    """Extract the JSON body from a response, handling markdown code blocks."""
+    match = _JSON_FENCE_RE.search(response_text) or _FENCE_RE.search(response_text)
+    return (match.group(1) if match else response_text).strip()
+
+
+def _parse_analysis(prompt_id: str, response_text: str) -> LLMAnalysis:
+    """Build an LLMAnalysis from the model's response text."""
+    try:
+        data = orjson.loads(_extract_json(response_text))
+    except orjson.JSONDecodeError as e:
         return LLMAnalysis(
-            prompt_id=prompt.id,
+            prompt_id=prompt_id,
             error=f"Failed to parse LLM response: {e}",
         )
+
+    return LLMAnalysis(
+        prompt_id=prompt_id,
+        ambiguities=data.get("ambiguities", []),
+        missing_context=data.get("missing_context", []),
+        injection_risks=data.get("injection_risks", []),
+        best_practice_issues=data.get("best_practice_issues", []),
+        suggested_revision=data.get("suggested_revision"),
+        revision_explanation=data.get("revision_explanation"),
+    )
+
+
+async def analyze_with_llm(prompt: Prompt) -> LLMAnalysis:
+    """Analyze a prompt using Claude.
+
+    Args:
+        prompt: The prompt to analyze.
+
+    Returns:
+        LLMAnalysis with detected issues and suggestions.
+    """
+    params = _analysis_params(prompt)
+    key = _request_key(params)
+    cached = _cached_analysis(key, prompt.id)
+    if cached is not None:
+        return cached
+
+    client = get_client()
+
+    try:
+        response_text = await _stream_text(client, params)
     except anthropic.APIError as e:
         return LLMAnalysis(
             prompt_id=prompt.id,
             error=f"API error: {e}",
         )
 
+    analysis = _parse_analysis(prompt.id, response_text)
+    _cache_analysis(key, analysis)
+    return analysis
+
+
+async def analyze_with_llm_many(
+    prompts: list[Prompt], max_concurrency: int = LLM_CONCURRENCY
+) -> list[LLMAnalysis]:
+    """Analyze several prompts with concurrent requests.
+
+    Args:
+        prompts: The prompts to analyze.
+        max_concurrency: Maximum number of requests in flight at once.
+
+    Returns:
+        One LLMAnalysis per prompt, in input order. A prompt whose request
+        failed gets an LLMAnalysis with error set; the others are unaffected.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def analyze_one(prompt: Prompt) -> LLMAnalysis:
+        async with semaphore:
+            return await analyze_with_llm(prompt)
+
+    outcomes = await asyncio.gather(
+        *(analyze_one(prompt) for prompt in prompts), return_exceptions=True
+    )
+    results: list[LLMAnalysis] = []
+    for prompt, outcome in zip(prompts, outcomes):
+        if isinstance(outcome, Exception):
+            outcome = LLMAnalysis(prompt_id=prompt.id, error=f"Analysis failed: {outcome}")
+        elif isinstance(outcome, BaseException):
+            raise outcome
+        results.append(outcome)
+    return results
+
+
+async def analyze_with_llm_batch(prompts: list[Prompt]) -> list[LLMAnalysis]:
+    """Analyze several prompts in one Message Batch.
+
+    Batches are billed at a discount and avoid one round-trip per prompt, but
+    results only arrive once the whole batch has finished processing.
+
+    Args:
+        prompts: The prompts to analyze.
+
+    Returns:
+        One LLMAnalysis per prompt, in input order.
+    """
+    all_params = [_analysis_params(prompt) for prompt in prompts]
+    keys = [_request_key(params) for params in all_params]
+    results = [_cached_analysis(key, prompt.id) for key, prompt in zip(keys, prompts)]
+    pending = [index for index, result in enumerate(results) if result is None]
+
+    if len(pending) == 1:
+        results[pending[0]] = await analyze_with_llm(prompts[pending[0]])
+        pending = []
+    if not pending:
+        return results
+
+    client = get_client()
+
+    # Prompt IDs need not be unique or match the custom_id format, so requests
+    # are keyed by position instead
+    requests = [
+        {"custom_id": f"prompt-{index}", "params": all_params[index]}
+        for index in pending
+    ]
+
+    try:
+        batch = await client.messages.batches.create(requests=requests)
+        while batch.processing_status != "ended":
+            await asyncio.sleep(BATCH_POLL_INTERVAL)
+            batch = await client.messages.batches.retrieve(batch.id)
+
+        async for entry in await client.messages.batches.results(batch.id):
+            index = int(entry.custom_id.removeprefix("prompt-"))
+            prompt_id = prompts[index].id
+            result = entry.result
+            if result.type == "succeeded":
+                analysis = _parse_analysis(prompt_id, result.message.content[0].text)
+                _cache_analysis(keys[index], analysis)
+                results[index] = analysis
+            elif result.type == "errored":
+                results[index] = LLMAnalysis(
+                    prompt_id=prompt_id,
+                    error=f"API error: {result.error.error.message}",
+                )
+            else:
+                results[index] = LLMAnalysis(
+                    prompt_id=prompt_id,
+                    error=f"Batch request {result.type}",
+                )
+    except anthropic.APIError as e:
+        for index in pending:
+            results[index] = LLMAnalysis(prompt_id=prompts[index].id, error=f"API error: {e}")
+
+    return [
+        result if result is not None
+        else LLMAnalysis(prompt_id=prompt.id, error="No result returned for batch request")
+        for prompt, result in zip(prompts, results)
+    ]
+
 
 async def generate_suggestions(
     prompt: Prompt,
@@ -147,8 +319,6 @@ async def generate_suggestions(
     Returns:
         Dictionary with original, suggested, explanation, and changes.
     """
-    client = get_client()
-
     # Build context from heuristic analysis
     context_parts = []
     if heuristic:
@@ -165,7 +335,9 @@ async def generate_suggestions(
         for dim_name in ["clarity", "specificity", "structure", "completeness", "output_format", "guardrails"]:
             dim = getattr(heuristic, dim_name)
             if dim.score < 70:
-                all_issues.extend([f"[{dim_name}] {issue}" for issue in dim.issues])
+                for issue in dim.issues:
+                    line_ref = f" (line {issue.line})" if issue.line else ""
+                    all_issues.append(f"[{dim_name}] {issue.message}{line_ref}")
         if all_issues:
             context_parts.append("\nIdentified issues:")
             context_parts.extend([f"- {issue}" for issue in all_issues[:10]])
@@ -189,34 +361,35 @@ async def generate_suggestions(
 
 Provide specific improvements in the specified JSON format."""
 
-    try:
-        response = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=3000,
-            system=SUGGESTION_SYSTEM_PROMPT,
-            messages=[{"role": "user", "content": user_message}],
-        )
+    params = {
+        "model": "claude-sonnet-4-20250514",
+        "max_tokens": 3000,
+        "system": _SUGGESTION_SYSTEM,
+        "messages": [{"role": "user", "content": user_message}],
+    }
+    key = _request_key(params)
+    cached = _response_cache.get(key)
+    if cached is not None:
+        _response_cache.move_to_end(key)
+        return dict(cached)
 
-        response_text = response.content[0].text
+    client = get_client()
 
-        # Extract JSON from response
-        if "```json" in response_text:
-            json_str = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            json_str = response_text.split("```")[1].split("```")[0].strip()
-        else:
-            json_str = response_text.strip()
+    try:
+        response_text = await _stream_text(client, params)
 
-        data = json.loads(json_str)
+        data = orjson.loads(_extract_json(response_text))
 
-        return {
+        result = {
             "original": prompt.content,
             "suggested": data.get("suggested", prompt.content),
             "explanation": data.get("explanation", ""),
             "changes": data.get("changes", []),
         }
+        _response_cache[key] = dict(result)
+        return result
 
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         return {
             "original": prompt.content,
             "suggested": prompt.content,
@@ -1,26 +1,35 @@
 """CLI entry point for promptdesign."""
 
-import asyncio
-import json
 import os
-import subprocess
-import sys
-import webbrowser
 from pathlib import Path
 from typing import Optional
 
 import typer
-import uvicorn
-from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+# Heavier dependencies (uvicorn, the backend services, the markdown parser and
+# its pydantic models, dotenv) are imported inside the commands that use them,
+# so --help and the quick commands don't pay for them.
+
+# Analysis dimensions in display order
+DIMENSION_NAMES = (
+    "clarity",
+    "specificity",
+    "structure",
+    "completeness",
+    "output_format",
+    "guardrails",
+)
 
-from cli.parser import parse_markdown_file, validate_markdown_file
+# Values accepted by check --type; each names a PromptType member
+PROMPT_TYPE_NAMES = ("system", "user", "skill")
 
 
 def check_api_key() -> bool:
-    """Check if ANTHROPIC_API_KEY is set."""
+    """Check if ANTHROPIC_API_KEY is set, loading the .env file first."""
+    from dotenv import load_dotenv
+
+    # Load environment variables from .env file
+    load_dotenv()
     return bool(os.environ.get("ANTHROPIC_API_KEY"))
 
 app = typer.Typer(
@@ -44,6 +53,10 @@ def serve(
     no_browser: bool = typer.Option(False, "--no-browser", help="Don't auto-open browser"),
 ) -> None:
     """Start the web UI server."""
+    import uvicorn
+
+    from cli.parser import validate_markdown_file
+
     typer.echo(f"Starting PromptDesign server on http://{host}:{port}")
 
     if file:
@@ -61,6 +74,7 @@ def serve(
 
         def open_browser() -> None:
             import time
+            import webbrowser
 
             time.sleep(1.5)
             webbrowser.open(f"http://{host}:{port}")
@@ -101,10 +115,21 @@ def analyze(
     ),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Show detailed output"),
     llm: bool = typer.Option(False, "--llm", "-l", help="Include LLM-powered deep analysis (requires API key)"),
+    batch: bool = typer.Option(
+        False,
+        "--batch",
+        help="With --llm, submit LLM analyses as one Message Batch (cheaper, but slower)",
+    ),
 ) -> None:
     """Run heuristic analysis on prompts in a file (no UI)."""
+    if batch and not llm:
+        raise typer.BadParameter("requires --llm", param_hint="'--batch'")
+
+    import asyncio
+
     from backend.services.config import load_config, set_config
     from backend.services.heuristics import analyze_prompt
+    from cli.parser import parse_markdown_file
 
     # Load custom config if specified
     if config_file:
@@ -132,69 +157,87 @@ def analyze(
 
     typer.echo(f"Found {len(parsed.prompts)} prompt(s)\n")
 
+    # LLM analyses for all prompts run up front, concurrently or as one batch
+    llm_results = None
+    if llm and batch:
+        from backend.services.llm import analyze_with_llm_batch
+
+        typer.echo("Submitting LLM analysis batch (this may take a while)...\n")
+        llm_results = asyncio.run(analyze_with_llm_batch(parsed.prompts))
+    elif llm:
+        from backend.services.llm import analyze_with_llm_many
+
+        typer.echo("Running LLM analysis...\n")
+        llm_results = asyncio.run(analyze_with_llm_many(parsed.prompts))
+
     results = []
-    for prompt in parsed.prompts:
+    for index, prompt in enumerate(parsed.prompts):
         analysis = analyze_prompt(prompt)
-        result_data = {"heuristic": analysis.model_dump()}
+        result_data = {"heuristic": analysis}
 
-        # Display summary
+        # Each prompt's summary is written in one go, not line by line
+        out: list[str] = []
         type_badge = "[SYS]" if prompt.type == "system" else "[USR]"
-        typer.echo(f"{type_badge} {prompt.name}")
-        typer.echo(f"    Overall Score: {analysis.overall_score}/100")
+        out.append(f"{type_badge} {prompt.name}")
+        out.append(f"    Overall Score: {analysis.overall_score}/100")
 
         if verbose:
-            typer.echo(f"    Clarity:       {analysis.clarity.score}/100")
-            typer.echo(f"    Specificity:   {analysis.specificity.score}/100")
-            typer.echo(f"    Structure:     {analysis.structure.score}/100")
-            typer.echo(f"    Completeness:  {analysis.completeness.score}/100")
-            typer.echo(f"    Output Format: {analysis.output_format.score}/100")
-            typer.echo(f"    Guardrails:    {analysis.guardrails.score}/100")
+            out.append(f"    Clarity:       {analysis.clarity.score}/100")
+            out.append(f"    Specificity:   {analysis.specificity.score}/100")
+            out.append(f"    Structure:     {analysis.structure.score}/100")
+            out.append(f"    Completeness:  {analysis.completeness.score}/100")
+            out.append(f"    Output Format: {analysis.output_format.score}/100")
+            out.append(f"    Guardrails:    {analysis.guardrails.score}/100")
 
             # Show top issues
             all_issues = []
-            for dim_name in ["clarity", "specificity", "structure", "completeness", "output_format", "guardrails"]:
+            for dim_name in DIMENSION_NAMES:
                 dim = getattr(analysis, dim_name)
                 for issue in dim.issues:
                     line_ref = f" (line {issue.line})" if issue.line else ""
                     all_issues.append(f"{issue.message}{line_ref}")
             if all_issues:
-                typer.echo("    Issues:")
+                out.append("    Issues:")
                 for issue in all_issues[:5]:
-                    typer.echo(f"      - {issue}")
+                    out.append(f"      - {issue}")
 
         # Run LLM analysis if requested
-        if llm:
-            from backend.services.llm import analyze_with_llm
-
-            typer.echo("    Running LLM analysis...")
-            llm_result = asyncio.run(analyze_with_llm(prompt))
-            result_data["llm"] = llm_result.model_dump()
+        if llm_results is not None:
+            llm_result = llm_results[index]
+            result_data["llm"] = llm_result
 
             if llm_result.error:
+                # Flush first so the error follows this prompt's summary
+                typer.echo("\n".join(out))
+                out.clear()
                 typer.echo(f"    LLM Error: {llm_result.error}", err=True)
             else:
                 if llm_result.ambiguities:
-                    typer.echo("    Ambiguities:")
+                    out.append("    Ambiguities:")
                     for item in llm_result.ambiguities[:3]:
-                        typer.echo(f"      - {item}")
+                        out.append(f"      - {item}")
                 if llm_result.missing_context:
-                    typer.echo("    Missing Context:")
+                    out.append("    Missing Context:")
                     for item in llm_result.missing_context[:3]:
-                        typer.echo(f"      - {item}")
+                        out.append(f"      - {item}")
                 if llm_result.injection_risks:
-                    typer.echo("    Injection Risks:")
+                    out.append("    Injection Risks:")
                     for item in llm_result.injection_risks[:3]:
-                        typer.echo(f"      - {item}")
+                        out.append(f"      - {item}")
                 if llm_result.best_practice_issues:
-                    typer.echo("    Best Practice Issues:")
+                    out.append("    Best Practice Issues:")
                     for item in llm_result.best_practice_issues[:3]:
-                        typer.echo(f"      - {item}")
+                        out.append(f"      - {item}")
 
         results.append(result_data)
-        typer.echo()
+        out.append("")
+        typer.echo("\n".join(out))
 
     if output:
-        output.write_text(json.dumps(results, indent=2))
+        import orjson
+
+        # orjson serializes the result dataclasses directly in one pass
+        output.write_bytes(orjson.dumps(results, option=orjson.OPT_INDENT_2))
         typer.echo(f"Results saved to: {output}")
 
 
@@ -209,6 +252,8 @@ def validate(
     ),
 ) -> None:
     """Validate a markdown file's prompt format."""
+    from cli.parser import parse_markdown_file, validate_markdown_file
+
     is_valid, errors = validate_markdown_file(file)
 
     if is_valid:
@@ -265,9 +310,12 @@ def suggest(
         typer.echo("Set it in .env file or export ANTHROPIC_API_KEY=your-key", err=True)
         raise typer.Exit(1)
 
+    import asyncio
+
     from backend.services.config import load_config, set_config
     from backend.services.heuristics import analyze_prompt
     from backend.services.llm import generate_suggestions
+    from cli.parser import parse_markdown_file
 
     # Load custom config if specified
     if config_file:
@@ -371,11 +419,12 @@ def check(
     llm: bool = typer.Option(False, "--llm", "-l", help="Include LLM-powered deep analysis"),
 ) -> None:
     """Analyze a prompt string directly (without a file)."""
-    import uuid
+    import asyncio
 
     from backend.models.schemas import Prompt, PromptType
     from backend.services.config import load_config, set_config
     from backend.services.heuristics import analyze_prompt
+    from cli.parser import make_prompt_id
 
     # Load custom config if specified
     if config_file:
@@ -389,7 +438,8 @@ def check(
     # Get prompt text
     if stdin:
         import sys
-        prompt_text = sys.stdin.read().strip()
+
+        prompt_text = sys.stdin.buffer.read().decode("utf-8", errors="replace").strip()
     elif prompt_text is None:
         typer.echo("Error: Provide prompt text as argument or use --stdin", err=True)
         raise typer.Exit(1)
@@ -403,21 +453,15 @@ def check(
         typer.echo("Error: ANTHROPIC_API_KEY not set. Required for --llm option.", err=True)
         raise typer.Exit(1)
 
-    # Map prompt type string to enum
-    type_map = {
-        "system": PromptType.SYSTEM,
-        "user": PromptType.USER,
-        "skill": PromptType.SKILL,
-    }
-    if prompt_type.lower() not in type_map:
+    if prompt_type.lower() not in PROMPT_TYPE_NAMES:
         typer.echo(f"Error: Invalid prompt type '{prompt_type}'. Use 'system', 'user', or 'skill'.", err=True)
         raise typer.Exit(1)
 
     # Create a prompt object
     prompt = Prompt(
-        id=str(uuid.uuid4()),
+        id=make_prompt_id("inline-prompt", prompt_text, 1),
         name="inline-prompt",
-        type=type_map[prompt_type.lower()],
+        type=PromptType(prompt_type.lower()),
         content=prompt_text,
         line_start=1,
         line_end=prompt_text.count("\n") + 1,
@@ -428,70 +472,79 @@ def check(
 
     # Run heuristic analysis
     analysis = analyze_prompt(prompt)
-    result_data = {"heuristic": analysis.model_dump()}
+    result_data = {"heuristic": analysis}
 
-    typer.echo(f"Overall Score: {analysis.overall_score}/100")
+    # Sections are collected and written with one echo each
+    out: list[str] = []
+    out.append(f"Overall Score: {analysis.overall_score}/100")
 
     if verbose:
-        typer.echo(f"  Clarity:       {analysis.clarity.score}/100")
-        typer.echo(f"  Specificity:   {analysis.specificity.score}/100")
-        typer.echo(f"  Structure:     {analysis.structure.score}/100")
-        typer.echo(f"  Completeness:  {analysis.completeness.score}/100")
-        typer.echo(f"  Output Format: {analysis.output_format.score}/100")
-        typer.echo(f"  Guardrails:    {analysis.guardrails.score}/100")
+        out.append(f"  Clarity:       {analysis.clarity.score}/100")
+        out.append(f"  Specificity:   {analysis.specificity.score}/100")
+        out.append(f"  Structure:     {analysis.structure.score}/100")
+        out.append(f"  Completeness:  {analysis.completeness.score}/100")
+        out.append(f"  Output Format: {analysis.output_format.score}/100")
+        out.append(f"  Guardrails:    {analysis.guardrails.score}/100")
 
         # Show issues
         all_issues = []
-        for dim_name in ["clarity", "specificity", "structure", "completeness", "output_format", "guardrails"]:
+        for dim_name in DIMENSION_NAMES:
             dim = getattr(analysis, dim_name)
             for issue in dim.issues:
                 line_ref = f" (line {issue.line})" if issue.line else ""
                 all_issues.append(f"{issue.message}{line_ref}")
         if all_issues:
-            typer.echo("\nIssues:")
+            out.append("\nIssues:")
             for issue in all_issues:
-                typer.echo(f"  - {issue}")
+                out.append(f"  - {issue}")
 
         # Show suggestions
         all_suggestions = []
-        for dim_name in ["clarity", "specificity", "structure", "completeness", "output_format", "guardrails"]:
+        for dim_name in DIMENSION_NAMES:
             dim = getattr(analysis, dim_name)
             all_suggestions.extend(dim.suggestions)
         if all_suggestions:
-            typer.echo("\nSuggestions:")
+            out.append("\nSuggestions:")
             for suggestion in all_suggestions:
-                typer.echo(f"  - {suggestion}")
+                out.append(f"  - {suggestion}")
 
     # Run LLM analysis if requested
     if llm:
         from backend.services.llm import analyze_with_llm
 
+        typer.echo("\n".join(out))
+        out.clear()
         typer.echo("\nRunning LLM analysis...")
         llm_result = asyncio.run(analyze_with_llm(prompt))
-        result_data["llm"] = llm_result.model_dump()
+        result_data["llm"] = llm_result
 
         if llm_result.error:
             typer.echo(f"LLM Error: {llm_result.error}", err=True)
         else:
             if llm_result.ambiguities:
-                typer.echo("\nAmbiguities:")
+                out.append("\nAmbiguities:")
                 for item in llm_result.ambiguities:
-                    typer.echo(f"  - {item}")
+                    out.append(f"  - {item}")
             if llm_result.missing_context:
-                typer.echo("\nMissing Context:")
+                out.append("\nMissing Context:")
                 for item in llm_result.missing_context:
-                    typer.echo(f"  - {item}")
+                    out.append(f"  - {item}")
             if llm_result.injection_risks:
-                typer.echo("\nInjection Risks:")
+                out.append("\nInjection Risks:")
                 for item in llm_result.injection_risks:
-                    typer.echo(f"  - {item}")
+                    out.append(f"  - {item}")
             if llm_result.best_practice_issues:
-                typer.echo("\nBest Practice Issues:")
+                out.append("\nBest Practice Issues:")
                 for item in llm_result.best_practice_issues:
-                    typer.echo(f"  - {item}")
+                    out.append(f"  - {item}")
+
+    if out:
+        typer.echo("\n".join(out))
 
     if output:
-        output.write_text(json.dumps(result_data, indent=2))
+        import orjson
+
+        output.write_bytes(orjson.dumps(result_data, option=orjson.OPT_INDENT_2))
         typer.echo(f"\nResults saved to: {output}")
 
 
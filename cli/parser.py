@@ -1,26 +1,44 @@
 """Markdown parser for extracting prompts from heading-based and YAML frontmatter formats."""
 
+import hashlib
+import mmap
 import re
-import uuid
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
 import yaml
 
 from backend.models.schemas import ParsedFile, Prompt, PromptMetadata, PromptType
+from backend.services.config import _SafeLoader
+
+# Pattern to find, in one pass over the whole content, prompt headings and the
+# level 1 or 2 headings that end a prompt.
+# Prompt headings: ## System Prompt, ## System Prompt: Name, ## User Prompt,
+# ## User Prompt: Name (group 1 is the type, group 2 the optional name).
+# Line-internal whitespace excludes newlines and the name must end on a
+# non-space, so leading and trailing whitespace on a heading line is ignored.
+SECTION_PATTERN = re.compile(
+    r"^[^\S\n]*(?:##[^\S\n]+(System|User)[^\S\n]+Prompt(?::[^\S\n]*(.*\S))?[^\S\n]*$|#(?!##))",
+    re.IGNORECASE | re.MULTILINE,
+)
 
+# Frontmatter keys mapped onto PromptMetadata fields
+KNOWN_METADATA_FIELDS = frozenset({"name", "description", "license", "version", "author", "tags"})
 
-# Pattern to match prompt headings
-# Matches: ## System Prompt, ## System Prompt: Name, ## User Prompt, ## User Prompt: Name
-HEADING_PATTERN = re.compile(
-    r"^##\s+(System|User)\s+Prompt(?::\s*(.+))?$",
-    re.IGNORECASE,
-)
+# Files at least this large are decoded straight from a memory map
+MMAP_MIN_SIZE = 64 * 1024
 
 # Pattern to detect YAML frontmatter
 FRONTMATTER_PATTERN = re.compile(r"^---\s*\n(.*?)\n---\s*\n", re.DOTALL)
 
 
+def make_prompt_id(name: str, content: str, line_start: int) -> str:
+    """Derive a stable prompt ID from the prompt's name, position and content."""
+    key = f"{name}\0{line_start}\0{content}".encode()
+    return hashlib.blake2b(key, digest_size=16).hexdigest()
+
+
 def parse_yaml_frontmatter(content: str) -> tuple[dict[str, Any] | None, str, int]:
     """Extract YAML frontmatter from content.
 
@@ -36,7 +54,7 @@ def parse_yaml_frontmatter(content: str) -> tuple[dict[str, Any] | None, str, in
 
     yaml_content = match.group(1)
     try:
-        metadata = yaml.safe_load(yaml_content)
+        metadata = yaml.load(yaml_content, Loader=_SafeLoader)
         if not isinstance(metadata, dict):
             return None, content, 0
     except yaml.YAMLError:
@@ -63,9 +81,11 @@ def parse_frontmatter_prompt(
     Returns:
         A Prompt object.
     """
-    # Extract known metadata fields
-    known_fields = {"name", "description", "license", "version", "author", "tags"}
-    extra = {k: str(v) for k, v in metadata.items() if k not in known_fields}
+    # Any other frontmatter keys are kept as strings in extra
+    if metadata.keys() <= KNOWN_METADATA_FIELDS:
+        extra = {}
+    else:
+        extra = {k: str(v) for k, v in metadata.items() if k not in KNOWN_METADATA_FIELDS}
 
     tags = metadata.get("tags", [])
     if isinstance(tags, str):
@@ -83,13 +103,15 @@ def parse_frontmatter_prompt(
 
     # Use name from frontmatter, or derive from filename
     name = metadata.get("name") or Path(filename).stem
+    prompt_content = content.strip()
+    line_start = frontmatter_end_line + 1
 
     return Prompt(
-        id=str(uuid.uuid4()),
+        id=make_prompt_id(name, prompt_content, line_start),
         name=name,
         type=PromptType.SKILL,
-        content=content.strip(),
-        line_start=frontmatter_end_line + 1,
+        content=prompt_content,
+        line_start=line_start,
         line_end=frontmatter_end_line + content.count("\n") + 1,
         metadata=prompt_metadata,
     )
@@ -105,8 +127,34 @@ def parse_markdown_file(file_path: str | Path) -> ParsedFile:
         ParsedFile containing all extracted prompts.
     """
     file_path = Path(file_path)
-    content = file_path.read_text(encoding="utf-8")
-    return parse_markdown_content(content, file_path.name)
+    stat = file_path.stat()
+    parsed = _parse_markdown_file_cached(
+        str(file_path.resolve()), file_path.name, stat.st_mtime_ns, stat.st_size
+    )
+    # Callers get their own prompt list; the prompts themselves are immutable
+    return parsed.model_copy(update={"prompts": list(parsed.prompts)})
+
+
+@lru_cache(maxsize=100)
+def _parse_markdown_file_cached(
+    path_str: str, filename: str, mtime_ns: int, size: int
+) -> ParsedFile:
+    """Parse a markdown file. mtime_ns and size are only part of the cache key."""
+    if size < MMAP_MIN_SIZE:
+        content = Path(path_str).read_text(encoding="utf-8")
+    else:
+        content = _read_mapped(path_str)
+    return parse_markdown_content(content, filename)
+
+
+def _read_mapped(path_str: str) -> str:
+    """Read a large file like Path.read_text without an intermediate bytes copy."""
+    with open(path_str, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        content = str(mm, "utf-8")
+    # Match read_text's universal newline translation
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return content
 
 
 def parse_markdown_content(content: str, filename: str = "untitled.md") -> ParsedFile:
@@ -134,79 +182,59 @@ def parse_markdown_content(content: str, filename: str = "untitled.md") -> Parse
         return ParsedFile(filename=filename, prompts=[prompt])
 
     # Fall back to heading-based format
-    lines = content.split("\n")
     prompts: list[Prompt] = []
 
     current_prompt: dict | None = None
-    current_content_lines: list[str] = []
     current_start_line: int = 0
+    body_start: int = 0
 
-    for line_num, line in enumerate(lines, start=1):
-        match = HEADING_PATTERN.match(line.strip())
-
-        if match:
-            # Save previous prompt if exists
-            if current_prompt is not None:
-                prompt_content = "\n".join(current_content_lines).strip()
-                if prompt_content:
-                    prompts.append(
-                        Prompt(
-                            id=str(uuid.uuid4()),
-                            name=current_prompt["name"],
-                            type=current_prompt["type"],
-                            content=prompt_content,
-                            line_start=current_start_line,
-                            line_end=line_num - 1,
-                        )
-                    )
+    def save_prompt(body_end: int, end_line: int) -> None:
+        # The prompt's content runs from the end of its heading to body_end
+        prompt_content = content[body_start:body_end].strip()
+        if prompt_content:
+            prompts.append(
+                Prompt(
+                    id=make_prompt_id(current_prompt["name"], prompt_content, current_start_line),
+                    name=current_prompt["name"],
+                    type=current_prompt["type"],
+                    content=prompt_content,
+                    line_start=current_start_line,
+                    line_end=end_line,
+                )
+            )
+
+    # Line numbers are advanced by counting newlines between matches
+    line_num = 1
+    counted_to = 0
+    for match in SECTION_PATTERN.finditer(content):
+        heading_type = match.group(1)
+        if heading_type is None and current_prompt is None:
+            # A level 1 or 2 heading outside any prompt
+            continue
+
+        line_num += content.count("\n", counted_to, match.start())
+        counted_to = match.start()
 
+        # A prompt heading or a level 1-2 heading ends the current prompt
+        if current_prompt is not None:
+            save_prompt(match.start(), line_num - 1)
+            current_prompt = None
+
+        if heading_type is not None:
             # Start new prompt
-            prompt_type_str = match.group(1).lower()
+            prompt_type_str = heading_type.lower()
             prompt_name = match.group(2) or f"{prompt_type_str.capitalize()} Prompt"
 
             current_prompt = {
                 "name": prompt_name.strip(),
                 "type": PromptType.SYSTEM if prompt_type_str == "system" else PromptType.USER,
             }
-            current_content_lines = []
             current_start_line = line_num
-
-        elif current_prompt is not None:
-            # Check if this is a new heading (any level) that ends the current prompt
-            if line.strip().startswith("#") and not line.strip().startswith("###"):
-                # This is a level 1 or 2 heading, save current prompt
-                prompt_content = "\n".join(current_content_lines).strip()
-                if prompt_content:
-                    prompts.append(
-                        Prompt(
-                            id=str(uuid.uuid4()),
-                            name=current_prompt["name"],
-                            type=current_prompt["type"],
-                            content=prompt_content,
-                            line_start=current_start_line,
-                            line_end=line_num - 1,
-                        )
-                    )
-                current_prompt = None
-                current_content_lines = []
-            else:
-                # Add line to current prompt content
-                current_content_lines.append(line)
+            body_start = match.end()
 
     # Don't forget the last prompt
     if current_prompt is not None:
-        prompt_content = "\n".join(current_content_lines).strip()
-        if prompt_content:
-            prompts.append(
-                Prompt(
-                    id=str(uuid.uuid4()),
-                    name=current_prompt["name"],
-                    type=current_prompt["type"],
-                    content=prompt_content,
-                    line_start=current_start_line,
-                    line_end=len(lines),
-                )
-            )
+        save_prompt(len(content), line_num + content.count("\n", counted_to))
 
     return ParsedFile(filename=filename, prompts=prompts)
 
@@ -0,0 +1,80 @@
+"""Tests for the pure ASGI CORS middleware."""
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from backend.middleware.cors import PureASGICors
+
+ALLOWED_ORIGIN = "http://localhost:5173"
+
+
+async def hello(request):
+    return PlainTextResponse("hello")
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = Starlette(routes=[Route("/hello", hello, methods=["GET", "POST"])])
+    return TestClient(PureASGICors(app, allow_origins=[ALLOWED_ORIGIN]))
+
+
+def test_allowed_preflight(client: TestClient) -> None:
+    response = client.options(
+        "/hello",
+        headers={
+            "Origin": ALLOWED_ORIGIN,
+            "Access-Control-Request-Method": "POST",
+            "Access-Control-Request-Headers": "content-type, x-token",
+        },
+    )
+
+    assert response.status_code == 204
+    assert response.content == b""
+    assert response.headers["access-control-allow-origin"] == ALLOWED_ORIGIN
+    assert response.headers["access-control-allow-methods"] == (
+        "DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"
+    )
+    assert response.headers["access-control-allow-headers"] == "content-type, x-token"
+    assert response.headers["access-control-allow-credentials"] == "true"
+    assert response.headers["access-control-max-age"] == "600"
+    assert response.headers["vary"] == "Origin"
+
+
+def test_disallowed_preflight(client: TestClient) -> None:
+    response = client.options(
+        "/hello",
+        headers={"Origin": "http://evil.example", "Access-Control-Request-Method": "POST"},
+    )
+
+    assert response.status_code == 400
+    assert response.text == "Disallowed CORS origin"
+    assert "access-control-allow-origin" not in response.headers
+
+
+def test_simple_request_from_allowed_origin(client: TestClient) -> None:
+    response = client.get("/hello", headers={"Origin": ALLOWED_ORIGIN})
+
+    assert response.status_code == 200
+    assert response.text == "hello"
+    assert response.headers["access-control-allow-origin"] == ALLOWED_ORIGIN
+    assert response.headers["access-control-allow-credentials"] == "true"
+    assert response.headers["vary"] == "Origin"
+
+
+def test_simple_request_from_other_origin(client: TestClient) -> None:
+    response = client.get("/hello", headers={"Origin": "http://evil.example"})
+
+    assert response.status_code == 200
+    assert "access-control-allow-origin" not in response.headers
+    assert response.headers["vary"] == "Origin"
+
+
+def test_request_without_origin(client: TestClient) -> None:
+    response = client.get("/hello")
+
+    assert response.status_code == 200
+    assert "access-control-allow-origin" not in response.headers
+    assert response.headers["vary"] == "Origin"
@@ -0,0 +1,120 @@
+"""Tests for the markdown prompt parser."""
+
+from pathlib import Path
+
+from backend.models.schemas import PromptType
+from cli.parser import MMAP_MIN_SIZE, parse_markdown_content, parse_markdown_file
+
+
+def test_headings_inside_code_fences_still_split_prompts() -> None:
+    # The parser does not track code fences: a prompt heading inside one starts
+    # a new prompt, and a level 1 heading inside one is skipped between prompts.
+    content = (
+        "## System Prompt\n"
+        "\n"
+        "Use this format:\n"
+        "\n"
+        "```markdown\n"
+        "# Title\n"
+        "## User Prompt\n"
+        "example\n"
+        "```\n"
+        "\n"
+        "Thanks.\n"
+    )
+    prompts = parse_markdown_content(content).prompts
+
+    assert [(p.type, p.content, p.line_start, p.line_end) for p in prompts] == [
+        (PromptType.SYSTEM, "Use this format:\n\n```markdown", 1, 5),
+        (PromptType.USER, "example\n```\n\nThanks.", 7, 12),
+    ]
+
+
+def test_duplicate_headings_give_separate_prompts() -> None:
+    content = (
+        "## User Prompt: Ask\n"
+        "\n"
+        "First question here.\n"
+        "\n"
+        "## User Prompt: Ask\n"
+        "\n"
+        "Second question here.\n"
+    )
+    prompts = parse_markdown_content(content).prompts
+
+    assert [(p.name, p.content, p.line_start) for p in prompts] == [
+        ("Ask", "First question here.", 1),
+        ("Ask", "Second question here.", 5),
+    ]
+    assert prompts[0].id != prompts[1].id
+
+
+def test_empty_sections_are_dropped() -> None:
+    content = (
+        "## System Prompt\n"
+        "\n"
+        "## User Prompt\n"
+        "\n"
+        "Hello there, please help.\n"
+        "\n"
+        "## User Prompt: Blank\n"
+        "   \n"
+    )
+    prompts = parse_markdown_content(content).prompts
+
+    assert [(p.name, p.type, p.content, p.line_start, p.line_end) for p in prompts] == [
+        ("User Prompt", PromptType.USER, "Hello there, please help.", 3, 6),
+    ]
+
+
+def test_frontmatter_metadata() -> None:
+    content = (
+        "---\n"
+        "name: reviewer\n"
+        "description: Reviews code\n"
+        "tags: a, b\n"
+        "owner: me\n"
+        "---\n"
+        "# Reviewer\n"
+        "\n"
+        "Review the diff.\n"
+    )
+    (prompt,) = parse_markdown_content(content, "reviewer-skill.md").prompts
+
+    assert prompt.name == "reviewer"
+    assert prompt.type == PromptType.SKILL
+    assert prompt.content == "# Reviewer\n\nReview the diff."
+    assert (prompt.line_start, prompt.line_end) == (7, 10)
+    assert prompt.metadata is not None
+    assert prompt.metadata.description == "Reviews code"
+    assert prompt.metadata.tags == ["a", "b"]
+    assert prompt.metadata.extra == {"owner": "me"}
+
+
+def test_frontmatter_name_defaults_to_filename() -> None:
+    content = "---\ndescription: No name\n---\nDo the task.\n"
+    (prompt,) = parse_markdown_content(content, "my-skill.md").prompts
+
+    assert prompt.name == "my-skill"
+
+
+def test_non_mapping_frontmatter_falls_back_to_headings() -> None:
+    content = "---\n- a\n- b\n---\n## System Prompt\n\nBe brief.\n"
+    prompts = parse_markdown_content(content).prompts
+
+    assert [(p.type, p.content, p.line_start) for p in prompts] == [
+        (PromptType.SYSTEM, "Be brief.", 5),
+    ]
+
+
+def test_parse_markdown_file_matches_content_parsing(tmp_path: Path) -> None:
+    body = "Answer the question in full sentences.\r\n" * (MMAP_MIN_SIZE // 20)
+    for name, text in [
+        ("small.md", "## System Prompt\r\n\r\nBe brief.\r\n"),
+        ("large.md", "## System Prompt\r\n\r\n" + body),
+    ]:
+        path = tmp_path / name
+        path.write_bytes(text.encode())
+        expected = parse_markdown_content(text.replace("\r\n", "\n"), name)
+
+        assert parse_markdown_file(path) == expected
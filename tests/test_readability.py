@@ -0,0 +1,27 @@
+"""Tests for the Flesch Reading Ease implementation."""
+
+import pytest
+
+from backend.services.heuristics import flesch_reading_ease
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("", 206.84),
+        ("   \n", 206.84),
+        ("Hello.", 36.62),
+        ("Stop. Go. Wait.", 119.19),
+        ("The cat sat on the mat.", 116.15),
+        ("Return 3 items. Use 10 words or fewer in each of the 25 answers.", 98.21),
+        (
+            "You are a helpful assistant. "
+            "Answer questions about the documentation clearly and concisely.",
+            39.5,
+        ),
+        ("Yes. You must always respond in valid JSON with the keys name and value.", 91.11),
+    ],
+)
+def test_flesch_reading_ease_scores(text: str, expected: float) -> None:
+    # Pinned to textstat's flesch_reading_ease for the same texts
+    assert flesch_reading_ease(text) == expected